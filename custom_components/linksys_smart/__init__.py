@@ -1,53 +1,123 @@
 """The linksys_smart component."""
 
+import logging
+import time
 from types import MappingProxyType
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
-from homeassistant.core import HomeAssistant
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP, Platform
+from homeassistant.core import Event, HomeAssistant
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers import config_validation as cv
+from homeassistant.helpers.storage import Store
 
-from .const import DOMAIN
+from .const import (
+    CONF_DEDICATED_CONNECTION,
+    DATA_CAPABILITIES,
+    DATA_SCHEDULER,
+    DEFAULT_DEDICATED_CONNECTION,
+    DOMAIN,
+    SNAPSHOT_VERSION,
+)
+from .capabilities import CapabilityCache
 from .controller import LinksysController
 from .hub import LinksysDataUpdateCoordinator
+from .scheduler import FleetScheduler
+from .services import async_setup_services, async_unload_services
+
+_LOGGER = logging.getLogger(__name__)
 
 CONFIG_SCHEMA = cv.removed(DOMAIN, raise_if_present=False)
 
-PLATFORMS = [Platform.DEVICE_TRACKER]
+PLATFORMS = [Platform.DEVICE_TRACKER, Platform.SENSOR]
 
 async def async_setup_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Set up the Linksys component."""
-    session = async_get_clientsession(hass)
-    config = MappingProxyType(config_entry.data)
-    api = LinksysController(session, config)
+    config = MappingProxyType({**config_entry.data, **config_entry.options})
+    session = None
+    if not config.get(CONF_DEDICATED_CONNECTION, DEFAULT_DEDICATED_CONNECTION):
+        session = async_get_clientsession(hass)
+    api = LinksysController(session, config, executor=hass.async_add_executor_job)
     await api.async_initialize()
-    coordinator = LinksysDataUpdateCoordinator(hass, config_entry, api)
+    scheduler: FleetScheduler = hass.data.setdefault(DOMAIN, {}).setdefault(
+        DATA_SCHEDULER, FleetScheduler()
+    )
+    scheduler.register(config_entry.entry_id)
+    capabilities: CapabilityCache = hass.data[DOMAIN].setdefault(
+        DATA_CAPABILITIES, CapabilityCache(hass)
+    )
+    coordinator = LinksysDataUpdateCoordinator(
+        hass, config_entry, api, scheduler, capabilities
+    )
 
-    await coordinator.api.async_get_linksys_details()
-    await coordinator.async_config_entry_first_refresh()
+    timings: dict[str, float] = {}
+    start = time.monotonic()
+    try:
+        if await coordinator.api.async_load_snapshot():
+            timings["snapshot"] = time.monotonic() - start
+            # Create entities from the snapshot and reconcile in the background
+            hass.async_create_task(coordinator.async_refresh())
+        else:
+            # Router details are fetched in the same transaction as the devices
+            await coordinator.async_config_entry_first_refresh()
+            timings["first_refresh"] = time.monotonic() - start
+    except Exception:
+        scheduler.unregister(config_entry.entry_id)
+        await api.async_close()
+        raise
 
     hass.data.setdefault(DOMAIN, {})[config_entry.entry_id] = coordinator
+    coordinator.async_update_router_device()
+    if config_entry.unique_id is None and coordinator.serial_num:
+        # Entries created before discovery have no unique ID to match on
+        hass.config_entries.async_update_entry(
+            config_entry, unique_id=coordinator.serial_num
+        )
 
+    phase = time.monotonic()
     await hass.config_entries.async_forward_entry_setups(config_entry, PLATFORMS)
+    timings["platforms"] = time.monotonic() - phase
 
-    device_registry = dr.async_get(hass)
-    device_registry.async_get_or_create(
-        config_entry_id=config_entry.entry_id,
-        connections={(DOMAIN, coordinator.serial_num)},
-        manufacturer=coordinator.manufacturer,
-        model=coordinator.model,
-        name=coordinator.hostname,
-        sw_version=coordinator.firmware,
+    _LOGGER.debug(
+        "Set up %s in %.3f s (%s)",
+        coordinator.host,
+        time.monotonic() - start,
+        ", ".join(f"{name} {duration:.3f} s" for name, duration in timings.items()),
     )
 
+    async_setup_services(hass)
+
+    async def async_stop(event: Event) -> None:
+        """Save the snapshot and close the dedicated connection pool.
+
+        Unload is not run on stop.
+        """
+        await coordinator.async_close()
+
+    config_entry.async_on_unload(
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, async_stop)
+    )
+    config_entry.async_on_unload(config_entry.add_update_listener(async_reload_entry))
+
     return True
 
+async def async_reload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Reload the config entry when options change."""
+    await hass.config_entries.async_reload(config_entry.entry_id)
+
+async def async_remove_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
+    """Remove the saved snapshot when a config entry is removed."""
+    await Store(hass, SNAPSHOT_VERSION, f"{DOMAIN}.{config_entry.entry_id}").async_remove()
+
 async def async_unload_entry(hass: HomeAssistant, config_entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     if unload_ok := await hass.config_entries.async_unload_platforms(
         config_entry, PLATFORMS
     ):
-        hass.data[DOMAIN].pop(config_entry.entry_id)
+        coordinator = hass.data[DOMAIN].pop(config_entry.entry_id)
+        hass.data[DOMAIN][DATA_SCHEDULER].unregister(config_entry.entry_id)
+        await coordinator.async_close()
+        if not hass.data[DOMAIN][DATA_SCHEDULER].entries:
+            async_unload_services(hass)
 
     return unload_ok
\ No newline at end of file
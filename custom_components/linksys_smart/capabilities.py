@@ -0,0 +1,54 @@
+"""Cache of the JNAP actions supported by each router firmware."""
+from __future__ import annotations
+
+import asyncio
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import CAPABILITIES_VERSION, DOMAIN, SNAPSHOT_SAVE_DELAY
+
+
+class CapabilityCache:
+    """Supported action versions keyed by router model and firmware version."""
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the cache."""
+        self._store: Store = Store(
+            hass, CAPABILITIES_VERSION, f"{DOMAIN}.capabilities", atomic_writes=True
+        )
+        self._data: dict[str, dict[str, str | None]] | None = None
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def key(model: str, firmware: str) -> str:
+        """Return the cache key of a router model and firmware."""
+        return f"{model}|{firmware}"
+
+    async def _async_load(self) -> dict[str, dict[str, str | None]]:
+        """Load the cache from storage once."""
+        async with self._lock:
+            if self._data is None:
+                self._data = await self._store.async_load() or {}
+        return self._data
+
+    async def async_get(
+        self, model: str, firmware: str
+    ) -> dict[str, str | None] | None:
+        """Return the cached capabilities of a firmware, if known."""
+        data = await self._async_load()
+        return data.get(self.key(model, firmware))
+
+    async def async_set(
+        self, model: str, firmware: str, capabilities: dict[str, str | None]
+    ) -> None:
+        """Cache the capabilities of a firmware."""
+        data = await self._async_load()
+        data[self.key(model, firmware)] = capabilities
+        self._store.async_delay_save(lambda: data, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self, model: str, firmware: str) -> None:
+        """Forget the cached capabilities of a firmware."""
+        data = await self._async_load()
+        if data.pop(self.key(model, firmware), None) is not None:
+            self._store.async_delay_save(lambda: data, SNAPSHOT_SAVE_DELAY)
@@ -2,13 +2,16 @@
 from __future__ import annotations
 
 from collections.abc import Mapping
+import ipaddress
 from types import MappingProxyType
 from typing import Any
+from urllib.parse import urlparse
 
 import voluptuous as vol
 
 from homeassistant.helpers.aiohttp_client import async_get_clientsession
 from homeassistant import config_entries
+from homeassistant.components import dhcp, network, ssdp
 from homeassistant.const import (
     CONF_HOST,
     CONF_PASSWORD,
@@ -16,14 +19,42 @@ from homeassistant.const import (
 )
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
+from homeassistant.exceptions import HomeAssistantError
 
 from .const import (
+    CONF_CONNECT_TIMEOUT,
+    CONF_CONSECUTIVE_HITS,
+    CONF_CONSECUTIVE_MISSES,
+    CONF_DEDICATED_CONNECTION,
     CONF_DETECTION_TIME,
+    CONF_MAX_INFLIGHT,
+    CONF_READ_TIMEOUT,
+    CONF_REMOVE_EVICTED,
+    CONF_RETENTION_DAYS,
+    CONF_RETENTION_MAX_DEVICES,
+    CONF_SCAN_INTERVAL_MAX,
+    CONF_SCAN_INTERVAL_MIN,
+    CONF_SUBNET,
+    CONF_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_CONSECUTIVE_HITS,
+    DEFAULT_CONSECUTIVE_MISSES,
+    DEFAULT_DEDICATED_CONNECTION,
     DEFAULT_DETECTION_TIME,
+    DEFAULT_MAX_INFLIGHT,
     DEFAULT_NAME,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_REMOVE_EVICTED,
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_RETENTION_MAX_DEVICES,
+    DEFAULT_SCAN_INTERVAL_MAX,
+    DEFAULT_SCAN_INTERVAL_MIN,
+    DEFAULT_TIMEOUT,
     DOMAIN,
+    MIN_SCAN_INTERVAL,
 )
 from .controller import LinksysController, LinksysError, AuthError, UnkownActionError
+from .discovery import async_probe, async_scan, subnet_hosts
 
 class LinksysFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a Linksys config flow."""
@@ -39,33 +70,95 @@ class LinksysFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
         """Get the options flow for this handler."""
         return LinksysOptionsFlowHandler(config_entry)
 
+    def __init__(self) -> None:
+        """Initialize the Linksys flow."""
+        self._discovered: dict[str, dict[str, Any]] = {}
+        self._host: str | None = None
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(step_id="user", menu_options=["scan", "manual"])
+
+    async def async_step_manual(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Set up a router by its address."""
         errors = {}
         if user_input is not None:
             self._async_abort_entries_match({CONF_HOST: user_input[CONF_HOST]})
 
+            errors, info = await self._async_validate(user_input)
+            if not errors:
+                return await self._async_create_entry(user_input, info)
+        return self.async_show_form(
+            step_id="manual",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_HOST): str,
+                    vol.Required(CONF_USERNAME, default="admin"): str,
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_scan(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Scan a subnet for routers that are not set up yet."""
+        errors = {}
+        if user_input is not None:
             try:
-                controller = LinksysController(async_get_clientsession(self.hass), MappingProxyType(user_input))
-                await controller.async_initialize()
-                await controller.async_check_admin_password()
-            except AuthError:
-                errors[CONF_USERNAME] = "invalid_auth"
-                errors[CONF_PASSWORD] = "invalid_auth"
-            except (LinksysError):
-                errors["base"] = "cannot_connect"
+                hosts = subnet_hosts(user_input[CONF_SUBNET])
+            except ValueError:
+                errors[CONF_SUBNET] = "invalid_subnet"
+            else:
+                found = await async_scan(async_get_clientsession(self.hass), hosts)
+                self._discovered = {
+                    host: info
+                    for host, info in found.items()
+                    if not self._async_is_configured(host, info)
+                }
+                if self._discovered:
+                    return await self.async_step_pick()
+                errors["base"] = "no_devices_found"
+
+        return self.async_show_form(
+            step_id="scan",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(
+                        CONF_SUBNET, default=await self._async_default_subnet()
+                    ): str,
+                }
+            ),
+            errors=errors,
+        )
 
+    async def async_step_pick(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Choose a router found by the scan and log in to it."""
+        errors = {}
+        if user_input is not None:
+            errors, info = await self._async_validate(user_input)
             if not errors:
-                return self.async_create_entry(
-                    title=f"{DEFAULT_NAME} ({user_input[CONF_HOST]})", data=user_input
-                )
+                return await self._async_create_entry(user_input, info)
+
+        routers = {
+            host: (
+                f"{info.get('description') or DEFAULT_NAME} "
+                f"({info.get('modelNumber')}, {host})"
+            )
+            for host, info in self._discovered.items()
+        }
         return self.async_show_form(
-            step_id="user",
+            step_id="pick",
             data_schema=vol.Schema(
                 {
-                    vol.Required(CONF_HOST): str,
+                    vol.Required(CONF_HOST): vol.In(routers),
                     vol.Required(CONF_USERNAME, default="admin"): str,
                     vol.Required(CONF_PASSWORD): str,
                 }
@@ -73,6 +166,103 @@ class LinksysFlowHandler(config_entries.ConfigFlow, domain=DOMAIN):
             errors=errors,
         )
 
+    async def async_step_dhcp(self, discovery_info: dhcp.DhcpServiceInfo) -> FlowResult:
+        """Handle a router found by DHCP."""
+        return await self._async_step_discovered(discovery_info.ip)
+
+    async def async_step_ssdp(self, discovery_info: ssdp.SsdpServiceInfo) -> FlowResult:
+        """Handle a router found by SSDP."""
+        if not (host := urlparse(discovery_info.ssdp_location or "").hostname):
+            return self.async_abort(reason="not_linksys_router")
+        return await self._async_step_discovered(host)
+
+    async def _async_step_discovered(self, host: str) -> FlowResult:
+        """Identify a discovered host, skipping routers already set up."""
+        self._async_abort_entries_match({CONF_HOST: host})
+        info = await async_probe(async_get_clientsession(self.hass), host)
+        if info is None:
+            return self.async_abort(reason="not_linksys_router")
+
+        await self.async_set_unique_id(info["serialNumber"])
+        self._abort_if_unique_id_configured(updates={CONF_HOST: host})
+
+        self._host = host
+        self.context["title_placeholders"] = {
+            "name": info.get("description") or DEFAULT_NAME,
+            "host": host,
+        }
+        return await self.async_step_confirm()
+
+    async def async_step_confirm(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Log in to a discovered router."""
+        errors = {}
+        assert self._host
+        if user_input is not None:
+            user_input = {CONF_HOST: self._host, **user_input}
+            errors, info = await self._async_validate(user_input)
+            if not errors:
+                return await self._async_create_entry(user_input, info)
+
+        return self.async_show_form(
+            step_id="confirm",
+            description_placeholders=self.context["title_placeholders"],
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_USERNAME, default="admin"): str,
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def _async_validate(
+        self, user_input: dict[str, Any]
+    ) -> tuple[dict[str, str], dict[str, Any] | None]:
+        """Log in to a router, returning any errors and the router details."""
+        errors = {}
+        info = None
+        try:
+            controller = LinksysController(async_get_clientsession(self.hass), MappingProxyType(user_input))
+            await controller.async_initialize()
+            await controller.async_check_admin_password()
+            info = await controller.async_get_device_info()
+        except AuthError:
+            errors[CONF_USERNAME] = "invalid_auth"
+            errors[CONF_PASSWORD] = "invalid_auth"
+        except (LinksysError):
+            errors["base"] = "cannot_connect"
+        return errors, info
+
+    async def _async_create_entry(
+        self, user_input: dict[str, Any], info: dict[str, Any] | None
+    ) -> FlowResult:
+        """Create the config entry of a router, unless it is set up already."""
+        if serial := (info or {}).get("serialNumber"):
+            await self.async_set_unique_id(serial, raise_on_progress=False)
+            self._abort_if_unique_id_configured(
+                updates={CONF_HOST: user_input[CONF_HOST]}
+            )
+        return self.async_create_entry(
+            title=f"{DEFAULT_NAME} ({user_input[CONF_HOST]})", data=user_input
+        )
+
+    @callback
+    def _async_is_configured(self, host: str, info: dict[str, Any]) -> bool:
+        """Return whether a router is set up already."""
+        return info.get("serialNumber") in self._async_current_ids() or any(
+            entry.data.get(CONF_HOST) == host for entry in self._async_current_entries()
+        )
+
+    async def _async_default_subnet(self) -> str:
+        """Return the /24 subnet Home Assistant is on."""
+        try:
+            source_ip = await network.async_get_source_ip(self.hass)
+        except (HomeAssistantError, OSError):
+            return ""
+        return str(ipaddress.ip_network(f"{source_ip}/24", strict=False))
+
     async def async_step_reauth(self, data: Mapping[str, Any]) -> FlowResult:
         """Perform reauth upon an API authentication error."""
         self._reauth_entry = self.hass.config_entries.async_get_entry(
@@ -125,6 +315,7 @@ class LinksysOptionsFlowHandler(config_entries.OptionsFlow):
     def __init__(self, config_entry: config_entries.ConfigEntry) -> None:
         """Initialize Linksys options flow."""
         self.config_entry = config_entry
+        self.options = dict(config_entry.options)
 
     async def async_step_init(
         self, user_input: dict[str, Any] | None = None
@@ -137,7 +328,8 @@ class LinksysOptionsFlowHandler(config_entries.OptionsFlow):
     ) -> FlowResult:
         """Manage the device tracker options."""
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            self.options.update(user_input)
+            return await self.async_step_retention()
 
         options = {
             vol.Optional(
@@ -146,8 +338,127 @@ class LinksysOptionsFlowHandler(config_entries.OptionsFlow):
                     CONF_DETECTION_TIME, DEFAULT_DETECTION_TIME
                 ),
             ): int,
+            vol.Optional(
+                CONF_CONSECUTIVE_HITS,
+                default=self.config_entry.options.get(
+                    CONF_CONSECUTIVE_HITS, DEFAULT_CONSECUTIVE_HITS
+                ),
+            ): vol.All(int, vol.Range(min=1)),
+            vol.Optional(
+                CONF_CONSECUTIVE_MISSES,
+                default=self.config_entry.options.get(
+                    CONF_CONSECUTIVE_MISSES, DEFAULT_CONSECUTIVE_MISSES
+                ),
+            ): vol.All(int, vol.Range(min=1)),
         }
 
         return self.async_show_form(
             step_id="device_tracker", data_schema=vol.Schema(options)
-        )
\ No newline at end of file
+        )
+
+    async def async_step_retention(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage how long departed devices are kept."""
+        if user_input is not None:
+            self.options.update(user_input)
+            return await self.async_step_polling()
+
+        options = {
+            vol.Optional(
+                CONF_RETENTION_DAYS,
+                default=self.config_entry.options.get(
+                    CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS
+                ),
+            ): vol.All(int, vol.Range(min=0)),
+            vol.Optional(
+                CONF_RETENTION_MAX_DEVICES,
+                default=self.config_entry.options.get(
+                    CONF_RETENTION_MAX_DEVICES, DEFAULT_RETENTION_MAX_DEVICES
+                ),
+            ): vol.All(int, vol.Range(min=0)),
+            vol.Optional(
+                CONF_REMOVE_EVICTED,
+                default=self.config_entry.options.get(
+                    CONF_REMOVE_EVICTED, DEFAULT_REMOVE_EVICTED
+                ),
+            ): bool,
+        }
+
+        return self.async_show_form(
+            step_id="retention", data_schema=vol.Schema(options)
+        )
+
+    async def async_step_polling(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the polling options."""
+        errors = {}
+        if user_input is not None:
+            if user_input[CONF_SCAN_INTERVAL_MIN] > user_input[CONF_SCAN_INTERVAL_MAX]:
+                errors["base"] = "invalid_scan_interval"
+            else:
+                self.options.update(user_input)
+                return await self.async_step_connection()
+
+        options = {
+            vol.Optional(
+                CONF_SCAN_INTERVAL_MIN,
+                default=self.config_entry.options.get(
+                    CONF_SCAN_INTERVAL_MIN, DEFAULT_SCAN_INTERVAL_MIN
+                ),
+            ): vol.All(int, vol.Range(min=MIN_SCAN_INTERVAL)),
+            vol.Optional(
+                CONF_SCAN_INTERVAL_MAX,
+                default=self.config_entry.options.get(
+                    CONF_SCAN_INTERVAL_MAX, DEFAULT_SCAN_INTERVAL_MAX
+                ),
+            ): vol.All(int, vol.Range(min=MIN_SCAN_INTERVAL)),
+        }
+
+        return self.async_show_form(
+            step_id="polling", data_schema=vol.Schema(options), errors=errors
+        )
+
+    async def async_step_connection(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the router connection options."""
+        if user_input is not None:
+            self.options.update(user_input)
+            return self.async_create_entry(title="", data=self.options)
+
+        options = {
+            vol.Optional(
+                CONF_DEDICATED_CONNECTION,
+                default=self.config_entry.options.get(
+                    CONF_DEDICATED_CONNECTION, DEFAULT_DEDICATED_CONNECTION
+                ),
+            ): bool,
+            vol.Optional(
+                CONF_MAX_INFLIGHT,
+                default=self.config_entry.options.get(
+                    CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT
+                ),
+            ): vol.All(int, vol.Range(min=1, max=2)),
+            vol.Optional(
+                CONF_TIMEOUT,
+                default=self.config_entry.options.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+            ): vol.All(int, vol.Range(min=1)),
+            vol.Optional(
+                CONF_CONNECT_TIMEOUT,
+                default=self.config_entry.options.get(
+                    CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT
+                ),
+            ): vol.All(int, vol.Range(min=1)),
+            vol.Optional(
+                CONF_READ_TIMEOUT,
+                default=self.config_entry.options.get(
+                    CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT
+                ),
+            ): vol.All(int, vol.Range(min=1)),
+        }
+
+        return self.async_show_form(
+            step_id="connection", data_schema=vol.Schema(options)
+        )
@@ -5,8 +5,118 @@ from typing import Final
 DOMAIN: Final = "linksys_smart"
 DEFAULT_NAME: Final = "Linksys"
 
+CONF_SUBNET: Final = "subnet"
+
 CONF_DETECTION_TIME: Final = "detection_time"
 DEFAULT_DETECTION_TIME: Final = 300
+CONF_CONSECUTIVE_HITS: Final = "consecutive_hits"
+DEFAULT_CONSECUTIVE_HITS: Final = 1
+CONF_CONSECUTIVE_MISSES: Final = "consecutive_misses"
+DEFAULT_CONSECUTIVE_MISSES: Final = 1
+
+CONF_RETENTION_DAYS: Final = "retention_days"
+DEFAULT_RETENTION_DAYS: Final = 30
+CONF_RETENTION_MAX_DEVICES: Final = "retention_max_devices"
+DEFAULT_RETENTION_MAX_DEVICES: Final = 2000
+CONF_REMOVE_EVICTED: Final = "remove_evicted"
+DEFAULT_REMOVE_EVICTED: Final = False
+
+CONF_SCAN_INTERVAL_MIN: Final = "scan_interval_min"
+DEFAULT_SCAN_INTERVAL_MIN: Final = 10
+# Shortest polling interval allowed, the fixed interval polling used to have
+MIN_SCAN_INTERVAL: Final = 10
+CONF_SCAN_INTERVAL_MAX: Final = "scan_interval_max"
+DEFAULT_SCAN_INTERVAL_MAX: Final = 60
+
+CONF_DEDICATED_CONNECTION: Final = "dedicated_connection"
+DEFAULT_DEDICATED_CONNECTION: Final = True
+CONF_MAX_INFLIGHT: Final = "max_inflight"
+DEFAULT_MAX_INFLIGHT: Final = 1
+CONF_TIMEOUT: Final = "timeout"
+DEFAULT_TIMEOUT: Final = 10
+CONF_CONNECT_TIMEOUT: Final = "connect_timeout"
+DEFAULT_CONNECT_TIMEOUT: Final = 5
+CONF_READ_TIMEOUT: Final = "read_timeout"
+DEFAULT_READ_TIMEOUT: Final = 10
+
+# Seconds between checks for devices past the retention age
+RETENTION_CHECK_INTERVAL: Final = 3600
+
+# Seconds an idle connection to the router is kept open for reuse
+KEEPALIVE_TIMEOUT: Final = 60
+
+# Attempts made for idempotent reads before giving up, and the base delay
+# in seconds of the jittered exponential backoff between them
+RETRY_ATTEMPTS: Final = 3
+RETRY_BACKOFF: Final = 0.5
+
+# Consecutive failures that open the circuit, and seconds before a trial
+# request is let through again
+CIRCUIT_FAILURE_THRESHOLD: Final = 5
+CIRCUIT_RESET_TIMEOUT: Final = 30
+
+# Version of the saved router and device snapshot, seconds to wait before
+# writing it after a change, and seconds between writes when only the last
+# seen times changed
+SNAPSHOT_VERSION: Final = 1
+SNAPSHOT_SAVE_DELAY: Final = 60
+SNAPSHOT_SEEN_INTERVAL: Final = 3600
+
+# Polls of link metrics kept per client, and the most clients tracked per
+# router, bounding metric memory to about 2 * 4 * window * clients bytes
+METRICS_WINDOW: Final = 30
+METRICS_MAX_CLIENTS: Final = 500
+
+# Key of the scheduler shared by all config entries in hass.data[DOMAIN]
+DATA_SCHEDULER: Final = "scheduler"
+# Key of the action capability cache shared by all config entries
+DATA_CAPABILITIES: Final = "capabilities"
+CAPABILITIES_VERSION: Final = 1
+# Most routers polled at once across all config entries, and the minimum
+# seconds between the start of two polls
+FLEET_MAX_CONCURRENT: Final = 4
+FLEET_STAGGER: Final = 0.5
+
+# Seconds writes are held so that writes arriving together share a request
+WRITE_COALESCE_WINDOW: Final = 0.5
+# Description of the parental control rule used to block devices
+BLOCK_RULE_DESCRIPTION: Final = "Home Assistant"
+
+# Event fired with the devices that joined, left or were first seen, and
+# seconds changes are gathered for before it is fired
+EVENT_DEVICES_CHANGED: Final = f"{DOMAIN}_devices_changed"
+EVENT_DEBOUNCE_COOLDOWN: Final = 1.0
+
+# Entities added per call when creating trackers for many devices at once
+ENTITY_CHUNK_SIZE: Final = 100
+
+# Responses of at least this many bytes are decoded, and device lists of at
+# least this many entries processed, in an executor instead of the event loop
+OFFLOAD_PAYLOAD_SIZE: Final = 256 * 1024
+OFFLOAD_DEVICE_COUNT: Final = 250
+
+# Routers probed at once when scanning a subnet, seconds to wait for each,
+# and the largest subnet scanned
+DISCOVERY_CONCURRENCY: Final = 128
+DISCOVERY_TIMEOUT: Final = 1.0
+DISCOVERY_MAX_HOSTS: Final = 1024
+
+# Mesh nodes queried at once, seconds to wait for a node, and seconds
+# between refreshes of node health and backhaul
+NODE_MAX_CONCURRENT: Final = 4
+NODE_TIMEOUT: Final = 2.0
+NODE_REFRESH_INTERVAL: Final = 60
+
+# Seconds between refreshes of the router details, which are also refreshed
+# whenever the router reboots
+DETAILS_REFRESH_INTERVAL: Final = 3600
+
+# Responses slower than this count as the router struggling, and the factors
+# the polling interval is multiplied by while the network is quiet and while
+# the router is struggling or failing
+SLOW_RESPONSE_THRESHOLD: Final = 2.0
+QUIET_BACKOFF: Final = 2
+STRUGGLING_BACKOFF: Final = 4
 
 ATTR_DEVICE_TRACKER: Final = [
     "deviceID",
@@ -14,6 +124,7 @@ ATTR_DEVICE_TRACKER: Final = [
     "model",
     "unit",
     "isAuthority",
+    "nodeType",
     "properties",
     "knownInterfaces",
     "connections",
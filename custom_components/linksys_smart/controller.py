@@ -1,14 +1,49 @@
 """Linksys Smart Wifi Network abstraction."""
 from __future__ import annotations
 
+import asyncio
 import base64
+import functools
+from collections.abc import Awaitable, Callable
+import json as jsonlib
 import logging
+import random
+import time
+import tracemalloc
 
-from aiohttp import ClientSession, ClientError
+from aiohttp import ClientError, ClientSession, ClientTimeout, TCPConnector
 from asyncio import TimeoutError
 from types import MappingProxyType
 from typing import Any
 
+from .const import (
+    BLOCK_RULE_DESCRIPTION,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_TIMEOUT,
+    CONF_CONNECT_TIMEOUT,
+    CONF_MAX_INFLIGHT,
+    CONF_READ_TIMEOUT,
+    CONF_TIMEOUT,
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_MAX_INFLIGHT,
+    DEFAULT_READ_TIMEOUT,
+    DEFAULT_TIMEOUT,
+    KEEPALIVE_TIMEOUT,
+    NODE_TIMEOUT,
+    OFFLOAD_PAYLOAD_SIZE,
+    RETRY_ATTEMPTS,
+    RETRY_BACKOFF,
+    WRITE_COALESCE_WINDOW,
+)
+from .stats import Instrumentation
+
+try:
+    import orjson
+
+    json_loads: Callable[[bytes], Any] = orjson.loads
+except ImportError:
+    json_loads = jsonlib.loads
+
 _LOGGER = logging.getLogger(__name__)
 
 LINKSYS_JNAP_ENDPOINT: str = "/JNAP/"
@@ -17,30 +52,237 @@ LINKSYS_JNAP_ACTION_HEADER = "X-JNAP-Action"
 LINKSYS_JNAP_AUTHORIZATION_HEADER = "X-JNAP-Authorization"
 LINKSYS_JNAP_ACTION_TRANSACTION = "http://linksys.com/jnap/core/Transaction"
 
+# Versions of each action the controller can use, best first
+ACTION_CANDIDATES: dict[str, tuple[str, ...]] = {
+    "devicelist/GetDevices": (
+        "devicelist/GetDevices3",
+        "devicelist/GetDevices2",
+        "devicelist/GetDevices",
+    ),
+    "networkconnections/GetNetworkConnections": (
+        "networkconnections/GetNetworkConnections2",
+        "networkconnections/GetNetworkConnections",
+    ),
+    "router/GetWANStatus": (
+        "router/GetWANStatus3",
+        "router/GetWANStatus2",
+        "router/GetWANStatus",
+    ),
+    "nodes/diagnostics/GetBackhaulInfo": ("nodes/diagnostics/GetBackhaulInfo",),
+}
+
+# Service each action version was added in, as listed by core/GetDeviceInfo.
+# Services are versioned cumulatively, so a later version of a service
+# provides the actions of the earlier ones too.
+ACTION_SERVICES: dict[str, str] = {
+    "devicelist/GetDevices3": "devicelist/DeviceList7",
+    "devicelist/GetDevices2": "devicelist/DeviceList4",
+    "devicelist/GetDevices": "devicelist/DeviceList",
+    "networkconnections/GetNetworkConnections2": "networkconnections/NetworkConnections2",
+    "networkconnections/GetNetworkConnections": "networkconnections/NetworkConnections",
+    "router/GetWANStatus3": "router/Router7",
+    "router/GetWANStatus2": "router/Router3",
+    "router/GetWANStatus": "router/Router",
+    "nodes/diagnostics/GetBackhaulInfo": "nodes/diagnostics/Diagnostics",
+}
+
+
+def _service_version(service: str) -> tuple[str, int]:
+    """Split a service name into its base name and version."""
+    base = service.rstrip("0123456789")
+    return base, int(service[len(base):] or 1)
+
+
+def capabilities_from_services(services: list[str]) -> dict[str, str | None] | None:
+    """Return the best version of each action the listed services provide.
+
+    Returns None when the router lists no services, so that the actions
+    have to be probed.
+    """
+    latest: dict[str, int] = {}
+    for service in services:
+        base, version = _service_version(
+            service.removeprefix(f"{LINKSYS_JNAP_ACTION_URL}/")
+        )
+        latest[base] = max(version, latest.get(base, 0))
+    if not latest:
+        return None
+
+    capabilities: dict[str, str | None] = {}
+    for name, candidates in ACTION_CANDIDATES.items():
+        capabilities[name] = None
+        for candidate in candidates:
+            base, version = _service_version(ACTION_SERVICES[candidate])
+            if latest.get(base, 0) >= version:
+                capabilities[name] = candidate
+                break
+    return capabilities
+
+# Request used to probe whether an action is supported
+PROBE_PAYLOADS: dict[str, dict[str, Any]] = {
+    # Ask for changes since a revision far in the future to keep it small
+    "devicelist/GetDevices": {"sinceRevision": 2**31 - 1},
+}
+
 class LinksysError(Exception):
     """Exception if api error occurs."""
 
+    code: str = "error"
+
 class AuthError(LinksysError):
     """Exception if auth error occurs."""
 
+    code = "_ErrorUnauthorized"
+
 class UnkownActionError(LinksysError):
     """Exception if unknown action error occurs."""
 
+    code = "_ErrorUnknownAction"
+
+class LinksysConnectionError(LinksysError):
+    """Exception if the router cannot be reached."""
+
+    code = "connection"
+
+class LinksysTimeoutError(LinksysConnectionError):
+    """Exception if the router does not respond in time."""
+
+    code = "timeout"
+
+class CircuitOpenError(LinksysConnectionError):
+    """Exception if requests are refused while the circuit is open."""
+
+    code = "circuit_open"
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+class CircuitBreaker:
+    """Fail fast after repeated connection failures to a router."""
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT,
+    ) -> None:
+        """Initialize the circuit breaker."""
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: float | None = None
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        """Return the state of the circuit."""
+        if self.opened_at is None:
+            return CIRCUIT_CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return CIRCUIT_HALF_OPEN
+        return CIRCUIT_OPEN
+
+    def allow(self) -> bool:
+        """Return whether a request may be sent, letting one trial through when half open."""
+        state = self.state
+        if state == CIRCUIT_CLOSED:
+            return True
+        if state == CIRCUIT_HALF_OPEN and not self._trial:
+            self._trial = True
+            return True
+        return False
+
+    def end_trial(self) -> None:
+        """Let another trial through after one ended without an outcome."""
+        self._trial = False
+
+    def record_success(self) -> None:
+        """Close the circuit after a successful request."""
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def record_failure(self) -> None:
+        """Count a failed request, opening the circuit at the threshold."""
+        self.failures += 1
+        if self._trial or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                _LOGGER.warning(
+                    "Router failed %s consecutive requests, pausing requests for %s seconds",
+                    self.failures,
+                    self.reset_timeout,
+                )
+            self.opened_at = time.monotonic()
+        self._trial = False
+
+def _is_read(action: str) -> bool:
+    """Return whether an action only reads from the router."""
+    return action.rsplit("/", 1)[-1].startswith(("Get", "Check"))
+
 class LinksysController:
-    """Manages a single Linksys Smart Wifi Network instance."""
+    """Manages a single Linksys Smart Wifi Network instance.
+
+    Without a session the controller owns a dedicated keep-alive connection
+    pool to the router, which must be closed with `async_close()`.
+    """
 
     def __init__(
-        self, session: ClientSession, config: MappingProxyType[str, Any],
+        self,
+        session: ClientSession | None,
+        config: MappingProxyType[str, Any],
+        decoder: Callable[[bytes], Any] = json_loads,
+        executor: Callable[..., Awaitable[Any]] | None = None,
     ) -> None:
-        """Initialize the system."""
+        """Initialize the system.
+
+        Large responses are decoded with `executor`, which runs a function
+        with arguments off the event loop. It defaults to the loop's
+        default executor.
+        """
         self._session = session
         self._config = config
         self.url: str = ""
         self.headers: dict[str, Any] = {}
-
+        self.decoder = decoder
+        self.last_decode: dict[str, float] = {}
+        # Seconds spent decoding responses on the event loop
+        self.loop_time = 0.0
+        self._executor = executor or self._run_in_executor
+        self.breaker = CircuitBreaker()
+        self.stats = Instrumentation()
+        self.capabilities: dict[str, str | None] = {}
+        # Called once after each batch of queued writes has been applied
+        self.write_callback: Callable[[], None] | None = None
+        self._writes: list[tuple[str, dict[str, Any], asyncio.Future]] = []
+        self._blocks: dict[str, bool] = {}
+        self._block_futures: list[asyncio.Future] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_tasks: set[asyncio.Task] = set()
+        self._flush_lock = asyncio.Lock()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._owns_session = session is None
+        self._inflight = asyncio.Semaphore(
+            self._config.get(CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT)
+        )
+        self.timeout = ClientTimeout(
+            total=self._config.get(CONF_TIMEOUT, DEFAULT_TIMEOUT),
+            connect=self._config.get(CONF_CONNECT_TIMEOUT, DEFAULT_CONNECT_TIMEOUT),
+            sock_read=self._config.get(CONF_READ_TIMEOUT, DEFAULT_READ_TIMEOUT),
+        )
 
     async def async_initialize(self):
         """Load Linksys Smart Wifi parameters."""
+        if self._session is None or (self._owns_session and self._session.closed):
+            self._session = ClientSession(
+                connector=TCPConnector(
+                    limit_per_host=self._config.get(
+                        CONF_MAX_INFLIGHT, DEFAULT_MAX_INFLIGHT
+                    ),
+                    keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ),
+                timeout=self.timeout,
+            )
+
         host = self._config.get("host")
         self.url = f"http://{host}{LINKSYS_JNAP_ENDPOINT}"
 
@@ -53,6 +295,45 @@ class LinksysController:
         self.headers[LINKSYS_JNAP_ACTION_HEADER] = LINKSYS_JNAP_ACTION_TRANSACTION
         self.headers[LINKSYS_JNAP_AUTHORIZATION_HEADER] = auth_string
 
+    async def async_close(self) -> None:
+        """Close the connection pool if it is owned by the controller."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+
+    def action(self, name: str) -> str:
+        """Return the version of an action supported by the router."""
+        if (action := self.capabilities.get(name, "")) is None:
+            raise UnkownActionError(f"{name} is not supported by the router.")
+        return action or ACTION_CANDIDATES.get(name, (name,))[0]
+
+    async def async_discover_capabilities(
+        self, services: list[str] | None = None
+    ) -> dict[str, str | None]:
+        """Find the best supported version of each action.
+
+        The versions are derived from the services the router lists in
+        `core/GetDeviceInfo`, and only probed one by one if it lists none.
+        Actions with no supported version are recorded as None.
+        """
+        if (capabilities := capabilities_from_services(services or [])) is not None:
+            _LOGGER.debug("capabilities (of %s) %s", self.url, capabilities)
+            self.capabilities = capabilities
+            return capabilities
+
+        capabilities = {}
+        for name, candidates in ACTION_CANDIDATES.items():
+            capabilities[name] = None
+            for candidate in candidates:
+                try:
+                    await self.request(candidate, PROBE_PAYLOADS.get(name, {}))
+                except UnkownActionError:
+                    continue
+                capabilities[name] = candidate
+                break
+        _LOGGER.debug("capabilities (of %s) %s", self.url, capabilities)
+        self.capabilities = capabilities
+        return capabilities
+
     async def async_check_admin_password(self) -> bool:
         """Load Linksys Smart Wifi devices"""
 
@@ -76,7 +357,7 @@ class LinksysController:
         payload = {
             "sinceRevision": 0
         }
-        responses = await self.request("devicelist/GetDevices3", payload)
+        responses = await self.request(self.action("devicelist/GetDevices"), payload)
         output = responses[0]['output']
 
         devices = output['devices']
@@ -85,31 +366,317 @@ class LinksysController:
     async def async_get_network_connections(self) -> list[dict]:
         """Load Linksys Smart Wifi network connections"""
 
-        responses = await self.request("networkconnections/GetNetworkConnections")
+        responses = await self.request(
+            self.action("networkconnections/GetNetworkConnections")
+        )
         output = responses[0]['output']
 
         connections = output['connections']
         return connections
 
+    async def async_get_devices_and_connections(
+        self, since_revision: int = 0, device_info: bool = False,
+    ) -> tuple[dict, list[dict], dict | None]:
+        """Load Linksys Smart Wifi device changes and network connections together
+
+        The device output holds the router's current `revision`, the `devices`
+        changed since `since_revision` and, for deltas, any `deletedDeviceIDs`.
+        With `device_info` the router details are fetched in the same
+        transaction, otherwise None is returned for them.
+        """
+        actions = [
+            (self.action("devicelist/GetDevices"), {"sinceRevision": since_revision}),
+            (self.action("networkconnections/GetNetworkConnections"), {}),
+        ]
+        if device_info:
+            actions.append(("core/GetDeviceInfo", {}))
+
+        outputs = await self.async_transaction(actions)
+
+        return outputs[0], outputs[1]['connections'], outputs[2] if device_info else None
+
+    async def async_get_backhaul_info(self) -> list[dict[str, Any]]:
+        """Load the backhaul connection of each mesh node."""
+        outputs = await self.async_transaction(
+            [(self.action("nodes/diagnostics/GetBackhaulInfo"), {})]
+        )
+        return outputs[0].get("backhaulDevices", [])
+
+    async def async_get_node_info(self, host: str) -> dict[str, Any]:
+        """Load the details of a mesh node from its own JNAP endpoint.
+
+        Nodes are asked once with a short timeout and outside the circuit
+        breaker, so one unreachable node neither holds up nor trips polling
+        of the router.
+        """
+        names = ["node/core/GetDeviceInfo"]
+        start = time.perf_counter()
+        try:
+            async with self._session.post(
+                f"http://{host}{LINKSYS_JNAP_ENDPOINT}",
+                headers={
+                    LINKSYS_JNAP_ACTION_HEADER: f"{LINKSYS_JNAP_ACTION_URL}/core/GetDeviceInfo"
+                },
+                json={},
+                timeout=ClientTimeout(total=NODE_TIMEOUT),
+            ) as res:
+                res.raise_for_status()
+                body = await res.read()
+            output = single_action_output(self.decoder(body), "core/GetDeviceInfo")
+        except LinksysError as err:
+            self.stats.record(names, time.perf_counter() - start, error=err.code)
+            raise
+        except (TimeoutError, ClientError, ValueError) as err:
+            error: LinksysError
+            if isinstance(err, TimeoutError):
+                error = LinksysTimeoutError(f"Timeout connecting to node {host}.")
+            elif isinstance(err, ClientError):
+                error = LinksysConnectionError(f"Error connecting to node {host}: {err}")
+            else:
+                error = LinksysError(f"Invalid JSON response from node {host}.")
+            self.stats.record(names, time.perf_counter() - start, error=error.code)
+            raise error from err
+
+        self.stats.record(names, time.perf_counter() - start, len(body))
+        return output
+
     async def async_get_wan_status(self) -> dict:
         """Load Linksys Smart Wifi network connections"""
 
-        responses = await self.request("router/GetWANStatus")
+        responses = await self.request(self.action("router/GetWANStatus"))
         output = responses[0]['output']
 
         return output
-    
+
+    async def async_set_device_name(self, device_id: str, name: str) -> None:
+        """Set the name of a device."""
+        await self.async_queue_write(
+            "devicelist/SetDeviceProperties",
+            {
+                "deviceID": device_id,
+                "propertiesToModify": [{"name": "userDeviceName", "value": name}],
+            },
+        )
+
+    async def async_set_device_blocked(self, mac: str, blocked: bool) -> None:
+        """Block or unblock internet access of a device using parental controls."""
+        future = asyncio.get_running_loop().create_future()
+        self._blocks[mac] = blocked
+        self._block_futures.append(future)
+        self._schedule_flush()
+        await future
+
+    async def async_queue_write(self, action: str, payload: dict[str, Any]) -> dict:
+        """Queue a write to be sent with others arriving within a short window.
+
+        Returns the output of the action once the batch has been applied.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._writes.append((action, payload, future))
+        self._schedule_flush()
+        return await future
+
+    def _schedule_flush(self) -> None:
+        """Send the queued writes once the coalescing window ends."""
+        if self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(
+                WRITE_COALESCE_WINDOW, self._start_flush
+            )
+
+    def _start_flush(self) -> None:
+        """Start sending the queued writes, keeping a reference to the task."""
+        self._flush_handle = None
+        task = asyncio.ensure_future(self._async_flush_writes())
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _async_flush_writes(self) -> None:
+        """Send all queued writes in a single transaction.
+
+        Flushes run one at a time, so a block change always reads the
+        parental control settings as left by the previous flush.
+        """
+        async with self._flush_lock:
+            writes, self._writes = self._writes, []
+            blocks, self._blocks = self._blocks, {}
+            block_futures, self._block_futures = self._block_futures, []
+            futures = [future for *_, future in writes]
+            try:
+                await self._async_send_writes(writes, blocks, block_futures)
+            finally:
+                # Never leave a caller waiting, whatever went wrong
+                _set_exception(
+                    futures + block_futures, LinksysError("Writes were not applied.")
+                )
+
+    async def _async_send_writes(
+        self,
+        writes: list[tuple[str, dict[str, Any], asyncio.Future]],
+        blocks: dict[str, bool],
+        block_futures: list[asyncio.Future],
+    ) -> None:
+        """Send writes and block changes, resolving their futures."""
+        actions = [(action, payload) for action, payload, _ in writes]
+        futures = [future for *_, future in writes]
+        applied_blocks: list[asyncio.Future] = []
+
+        if blocks:
+            # Parental control rules are replaced as a whole, so every block
+            # change is folded into a single read-modify-write. The read must
+            # not join one started before the previous write was applied.
+            try:
+                settings = await self.request_batch(
+                    [("parentalcontrol/GetParentalControlSettings", {})],
+                    coalesce=False,
+                )
+            except LinksysError as err:
+                _set_exception(block_futures, err)
+            else:
+                actions.append(
+                    (
+                        "parentalcontrol/SetParentalControlSettings",
+                        _apply_blocks(settings[0].get("output", {}), blocks),
+                    )
+                )
+                applied_blocks = block_futures
+
+        if not actions:
+            return
+
+        _LOGGER.debug("writing (to %s) %s actions", self.url, len(actions))
+        try:
+            outputs = await self.async_transaction(actions)
+        except LinksysError as err:
+            # Transactions are applied atomically, so every write failed
+            _set_exception(futures + applied_blocks, err)
+        else:
+            for future, output in zip(futures, outputs):
+                if not future.done():
+                    future.set_result(output)
+            # Block changes all share the single settings write
+            for future in applied_blocks:
+                if not future.done():
+                    future.set_result(None)
+        finally:
+            if self.write_callback is not None:
+                self.write_callback()
+
+    async def async_transaction(
+        self,
+        actions: list[tuple[str, dict[str, Any]]],
+    ) -> list[dict[str, Any]]:
+        """Run multiple actions in a single transaction.
+
+        Returns the output of each action in the order they were given.
+        """
+        responses = await self.request_batch(actions)
+
+        return [response.get("output", {}) for response in responses]
+
     async def request(
         self,
         action: str,
         payload: dict[str, Any] = {},
     ):
         """Make a request to the API."""
+        return await self.request_batch([(action, payload)])
+
+    async def request_batch(
+        self,
+        actions: list[tuple[str, dict[str, Any]]],
+        coalesce: bool = True,
+    ):
+        """Make a transaction request containing multiple actions to the API.
+
+        Concurrent identical reads share a single request to the router and
+        are retried with backoff, while writes are sent exactly once. Without
+        `coalesce` every call sends its own request, as for load testing.
+        """
+        if not all(_is_read(action) for action, _ in actions):
+            return await self._request_guarded(actions)
+        if not coalesce:
+            return await self._request_with_retry(actions)
+
+        key = jsonlib.dumps(actions, sort_keys=True)
+        if (pending := self._pending.get(key)) is None:
+            pending = asyncio.ensure_future(self._request_with_retry(actions))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+        else:
+            _LOGGER.debug("joining in-flight request to %s", self.url)
+
+        # Shield so one caller cancelling does not cancel the others
+        return await asyncio.shield(pending)
+
+    async def _request_with_retry(self, actions: list[tuple[str, dict[str, Any]]]):
+        """Send a read request, retrying connection failures."""
+        for attempt in range(RETRY_ATTEMPTS):
+            try:
+                return await self._request_guarded(actions)
+            except CircuitOpenError:
+                raise
+            except LinksysConnectionError as err:
+                if attempt + 1 == RETRY_ATTEMPTS:
+                    raise
+                delay = random.uniform(0, RETRY_BACKOFF * 2**attempt)
+                _LOGGER.debug(
+                    "request to %s failed (%s), retrying in %.2f s", self.url, err, delay
+                )
+                await asyncio.sleep(delay)
+
+    async def _request_guarded(self, actions: list[tuple[str, dict[str, Any]]]):
+        """Send a request through the circuit breaker."""
+        names = [action for action, _ in actions]
+        if not self.breaker.allow():
+            # Nothing was sent, so there is no latency to record
+            self.stats.record_error(names, CircuitOpenError.code)
+            raise CircuitOpenError(
+                f"Not connecting to {self.url} after {self.breaker.failures} failures."
+            )
+        decoded: dict[str, float] = {}
+        start = time.perf_counter()
+        try:
+            response, decoded = await self._request(actions)
+            _raise_on_error(response, names)
+        except LinksysError as err:
+            self.stats.record(
+                names,
+                time.perf_counter() - start,
+                int(decoded.get("bytes", 0)),
+                error=err.code,
+            )
+            if isinstance(err, LinksysConnectionError):
+                self.breaker.record_failure()
+            else:
+                # The router answered, so it is reachable
+                self.breaker.record_success()
+            raise
+        finally:
+            # A trial cancelled or failing otherwise must not block all requests
+            self.breaker.end_trial()
+        self.last_decode = decoded
+        self.stats.record(
+            names,
+            time.perf_counter() - start,
+            int(decoded.get("bytes", 0)),
+            decoded.get("decode_time", 0.0),
+        )
+        self.breaker.record_success()
+        return response["responses"]
+
+    async def _request(
+        self, actions: list[tuple[str, dict[str, Any]]]
+    ) -> tuple[Any, dict[str, float]]:
+        """Send a transaction to the router.
+
+        Returns the decoded response with the size and cost of decoding it.
+        """
         json = [
             {
                 "request": payload,
                 "action": f"{LINKSYS_JNAP_ACTION_URL}/{action}",
             }
+            for action, payload in actions
         ]
 
         try:
@@ -120,7 +687,9 @@ class LinksysController:
                 self.headers,
                 json,
             )
-            async with self._session.request("post", self.url, headers=self.headers, json=json, timeout=10) as res:
+            async with self._inflight, self._session.request(
+                "post", self.url, headers=self.headers, json=json, timeout=self.timeout
+            ) as res:
                 _LOGGER.debug(
                     "received (from %s) %s %s %s",
                     self.url,
@@ -131,16 +700,134 @@ class LinksysController:
 
                 res.raise_for_status()
 
-                response = await res.json()
-                _LOGGER.debug("data (from %s) %s", self.url, response)
-                _raise_on_error(response)
-                
-                return response["responses"]
-        except TimeoutError:
-            raise ClientError("Timeout occurred when attempting to connect to router.")
-        
+                body = await res.read()
+        except TimeoutError as err:
+            raise LinksysTimeoutError(
+                "Timeout occurred when attempting to connect to router."
+            ) from err
+        except ClientError as err:
+            raise LinksysConnectionError(
+                f"Error occurred when attempting to connect to router: {err}"
+            ) from err
+
+        if len(body) >= OFFLOAD_PAYLOAD_SIZE:
+            return await self._executor(self.decode, body)
 
-def _raise_on_error(data: dict[str, Any] | None) -> None:
+        start = time.perf_counter()
+        try:
+            return self.decode(body)
+        finally:
+            self.loop_time += time.perf_counter() - start
+
+    @staticmethod
+    async def _run_in_executor(target: Callable[..., Any], *args: Any) -> Any:
+        """Run a function in the default executor of the running loop."""
+        return await asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(target, *args)
+        )
+
+    def decode(self, body: bytes) -> tuple[Any, dict[str, float]]:
+        """Decode a raw response body, returning it with its size and cost.
+
+        Does not touch the event loop or the controller's state, so it can
+        run in an executor.
+        """
+        tracing = tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+
+        start = time.perf_counter()
+        try:
+            data = self.decoder(body)
+        except ValueError as err:
+            raise LinksysError("Invalid JSON response from router.") from err
+        elapsed = time.perf_counter() - start
+
+        decoded = {"bytes": len(body), "decode_time": elapsed}
+        if tracing:
+            decoded["allocated"] = tracemalloc.get_traced_memory()[1] - before
+
+        _LOGGER.debug(
+            "data (from %s) %s bytes decoded in %.1f ms",
+            self.url,
+            len(body),
+            elapsed * 1000,
+        )
+        return data, decoded
+
+
+def _set_exception(futures: list[asyncio.Future], err: Exception) -> None:
+    """Fail every future not already done."""
+    for future in futures:
+        if not future.done():
+            future.set_exception(err)
+
+
+def _apply_blocks(settings: dict[str, Any], blocks: dict[str, bool]) -> dict[str, Any]:
+    """Return parental control settings with devices added to or removed from the blocking rule."""
+    rules = [dict(rule) for rule in settings.get("rules", [])]
+    rule = next(
+        (rule for rule in rules if rule.get("description") == BLOCK_RULE_DESCRIPTION),
+        None,
+    )
+    if rule is None:
+        rule = {
+            "isEnabled": True,
+            "description": BLOCK_RULE_DESCRIPTION,
+            "macAddresses": [],
+            # Every half hour of every day is blocked
+            "wanSchedule": {
+                day: "1" * 48
+                for day in (
+                    "sunday", "monday", "tuesday", "wednesday",
+                    "thursday", "friday", "saturday",
+                )
+            },
+            "blockedURLs": [],
+        }
+        rules.append(rule)
+
+    macs = [
+        mac.upper()
+        for mac in rule.get("macAddresses", [])
+        if blocks.get(mac.upper(), True)
+    ]
+    macs.extend(mac for mac, blocked in blocks.items() if blocked and mac not in macs)
+    rule["macAddresses"] = macs
+    if not macs:
+        rules.remove(rule)
+
+    return {
+        "isParentalControlEnabled": bool(rules) or settings.get(
+            "isParentalControlEnabled", False
+        ),
+        "rules": rules,
+    }
+
+
+def single_action_output(data: Any, action: str) -> dict[str, Any]:
+    """Return the output of a response to a single action.
+
+    Actions sent on their own rather than in a transaction are answered
+    with a bare `result` and `output`. Raises for any result other than OK.
+    """
+    if not isinstance(data, dict) or "result" not in data:
+        raise LinksysError("Unexpected reponse from router.")
+
+    if (result := data["result"]) != "OK":
+        if result == "_ErrorUnauthorized":
+            raise AuthError()
+        if result == "_ErrorUnknownAction":
+            raise UnkownActionError()
+        exc = LinksysError(f"{action}: {data.get('error', result)}")
+        exc.code = result
+        raise exc
+
+    return data.get("output") or {}
+
+
+def _raise_on_error(data: dict[str, Any] | None, actions: list[str] | None = None) -> None:
     """Check response for error message."""
     if not isinstance(data, dict):
         return None
@@ -152,9 +839,17 @@ def _raise_on_error(data: dict[str, Any] | None) -> None:
         # Error
         if data["result"] == "_ErrorUnknownAction":
             raise UnkownActionError()
-        response = data["responses"][0]
-        if response["result"] == "_ErrorUnauthorized":
-            raise AuthError()
-        if "error" in response:
-            raise LinksysError(response["error"])
-            
\ No newline at end of file
+        # A failed transaction stops at the first failing action, so report
+        # that one back to the caller.
+        for index, response in enumerate(data["responses"]):
+            if response.get("result") == "OK":
+                continue
+            if response["result"] == "_ErrorUnauthorized":
+                raise AuthError()
+            if response["result"] == "_ErrorUnknownAction":
+                raise UnkownActionError()
+            action = actions[index] if actions and index < len(actions) else None
+            error = response.get("error", response["result"])
+            exc = LinksysError(f"{action}: {error}" if action else error)
+            exc.code = response["result"]
+            raise exc
@@ -9,64 +9,161 @@ import homeassistant.util.dt as dt_util
 
 from .const import ATTR_DEVICE_TRACKER
 
+# Attribute names are fixed, so slugify them once rather than on every read
+ATTR_SLUGS: dict[str, str] = {attr: slugify(attr) for attr in ATTR_DEVICE_TRACKER}
+
 
 class Device:
-    """Represents a network device."""
+    """Represents a network device.
+
+    Only the values read by entities are kept. They are derived from the
+    router params when they change, so reading them is free.
+    """
 
+    __slots__ = (
+        "_mac",
+        "_device_id",
+        "_revision",
+        "_name",
+        "_ip_address",
+        "_attrs",
+        "_last_seen",
+        "_first_seen",
+    )
 
-    def __init__(self, mac: str, params: dict[str, Any]):
+    def __init__(self, mac: str, params: dict[str, Any] | None = None):
         """Initialize the network device."""
         self._mac = mac
-        self._params = params
-        self._last_seen: datetime | None = None
+        self._device_id: str | None = None
+        self._revision: int | None = None
+        self._name: str | None = None
+        self._ip_address: str | None = None
         self._attrs: dict[str, Any] = {}
+        self._last_seen: datetime | None = None
+        self._first_seen: datetime = dt_util.utcnow()
+        if params:
+            self.update(params=params)
+
+    @staticmethod
+    def derive(
+        params: dict[str, Any]
+    ) -> tuple[str | None, str | None, str | None, dict[str, Any]]:
+        """Derive device id, name, ip address and attributes from router params."""
+        device_id = params.get("deviceID")
+
+        # Check properties for name value, then friendly name, and default
+        # to device_id if nothing else can be found
+        name = None
+        for prop in params.get("properties", []):
+            if prop["name"] == "userDeviceName":
+                name = prop["value"]
+                break
+        else:
+            name = params.get("friendlyName") or device_id
+
+        ip_address = None
+        if len(connections := params.get("connections", [])) == 1:
+            ip_address = connections[0].get("ipAddress")
+
+        attrs = {
+            slug: params[attr] for attr, slug in ATTR_SLUGS.items() if attr in params
+        }
+
+        return device_id, name, ip_address, attrs
+
+    @classmethod
+    def from_snapshot(cls, mac: str, data: list[Any]) -> Device:
+        """Create a device from a saved snapshot."""
+        device = cls.__new__(cls)
+        device._mac = mac
+        device._revision = None
+        device._device_id, device._name, device._ip_address, device._attrs = data[:4]
+        device._last_seen = (
+            dt_util.utc_from_timestamp(data[4]) if data[4] is not None else None
+        )
+        # Snapshots saved before first seen times were kept start from now
+        device._first_seen = (
+            dt_util.utc_from_timestamp(data[5]) if len(data) > 5 else dt_util.utcnow()
+        )
+        return device
+
+    def as_snapshot(self) -> list[Any]:
+        """Return a compact representation of the device for saving."""
+        return [
+            self._device_id,
+            self._name,
+            self._ip_address,
+            self._attrs,
+            self._last_seen.timestamp() if self._last_seen else None,
+            self._first_seen.timestamp(),
+        ]
 
     @property
     def name(self) -> str | None:
         """Return device name."""
-        # Check properties for name value and return if found
-        for prop in self._params.get("properties", []):
-            if prop["name"] == "userDeviceName":
-                return prop["value"]
-        
-        # If device has a friendly name, return that
-        if self._params.get("friendlyName"):
-            return self._params.get("friendlyName")
-
-        # default to device_id if nothing else can be found
-        return self._params.get("deviceID")
+        return self._name
 
     @property
     def ip_address(self) -> str | None:
         """Return device ip address."""
-        if len(connections := self._params.get("connections", [])) == 1:
-            return connections[0].get("ipAddress")
+        return self._ip_address
 
     @property
     def mac(self) -> str | None:
         """Return device mac."""
         return self._mac
 
+    @property
+    def device_id(self) -> str | None:
+        """Return router device id."""
+        return self._device_id
+
+    @property
+    def revision(self) -> int | None:
+        """Return router revision of the last change to this device."""
+        return self._revision
+
     @property
     def last_seen(self) -> datetime | None:
         """Return device last seen."""
         return self._last_seen
 
+    @property
+    def first_seen(self) -> datetime:
+        """Return when the device was first known."""
+        return self._first_seen
+
     @property
     def attrs(self) -> dict[str, Any]:
         """Return device attributes."""
-        for attr in ATTR_DEVICE_TRACKER:
-            if attr in self._params:
-                self._attrs[slugify(attr)] = self._params[attr]
         return self._attrs
 
     def update(
         self,
         params: dict[str, Any] | None = None,
         active: bool = False,
-    ) -> None:
-        """Update Device params."""
+    ) -> bool:
+        """Update Device params.
+
+        Returns whether any of the derived values changed.
+        """
+        changed = False
         if params:
-            self._params = params
+            revision = params.get("lastChangeRevision")
+            if revision is None or revision != self._revision:
+                changed = self.apply(revision, self.derive(params))
         if active:
-            self._last_seen = dt_util.utcnow()
\ No newline at end of file
+            self._last_seen = dt_util.utcnow()
+        return changed
+
+    def apply(
+        self,
+        revision: int | None,
+        derived: tuple[str | None, str | None, str | None, dict[str, Any]],
+    ) -> bool:
+        """Set values derived from router params, returning whether they changed."""
+        self._revision = revision
+        if derived == (self._device_id, self._name, self._ip_address, self._attrs):
+            return False
+        self._device_id, self._name, self._ip_address, self._attrs = derived
+        return True
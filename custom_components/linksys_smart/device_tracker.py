@@ -1,19 +1,27 @@
 """Linksys Smart Wifi device tracking"""
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Iterable
+from typing import Any
+
 from homeassistant.components.device_tracker import (
     DOMAIN as DEVICE_TRACKER,
     ScannerEntity,
     SourceType,
 )
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.core import Event as HomeAssistant, callback
+from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
-import homeassistant.util.dt as dt_util
 
-from .const import DOMAIN
+from .const import (
+    CONF_REMOVE_EVICTED,
+    DEFAULT_REMOVE_EVICTED,
+    DOMAIN,
+    ENTITY_CHUNK_SIZE,
+)
 from .hub import Device, LinksysDataUpdateCoordinator
 
 async def async_setup_entry(
@@ -30,42 +38,58 @@ async def async_setup_entry(
 
     registry = er.async_get(hass)
 
-    # Restore clients that is not a part of active clients list.
-    for entity in registry.entities.values():
-        if (
-            entity.config_entry_id == config_entry.entry_id
-            and entity.domain == DEVICE_TRACKER
-        ):
-            if (
-                entity.unique_id in coordinator.api.devices
-                or entity.unique_id not in coordinator.api.all_devices
-            ):
-                continue
-            coordinator.api.restore_device(entity.unique_id)
+    remove_evicted = config_entry.options.get(
+        CONF_REMOVE_EVICTED, DEFAULT_REMOVE_EVICTED
+    )
 
     @callback
     def update_hub() -> None:
-        """Update the status of the device."""
-        update_items(coordinator, async_add_entities, tracked)
+        """Add trackers for devices first seen in the last poll."""
+        if remove_evicted:
+            for mac in coordinator.api.evicted:
+                entity_id = registry.async_get_entity_id(DEVICE_TRACKER, DOMAIN, mac)
+                if entity_id is not None:
+                    registry.async_remove(entity_id)
+                tracked.pop(mac, None)
+
+        added: list[str] = []
+        for mac in coordinator.api.added:
+            if (tracker := tracked.get(mac)) is None:
+                added.append(mac)
+            else:
+                # Evicted earlier and seen again, so follow the new device
+                tracker.device = coordinator.api.devices[mac]
+        if added:
+            hass.async_create_task(
+                async_add_items(coordinator, async_add_entities, tracked, added)
+            )
 
     config_entry.async_on_unload(coordinator.async_add_listener(update_hub))
 
-    update_hub()
+    await async_add_items(
+        coordinator, async_add_entities, tracked, list(coordinator.api.devices)
+    )
 
-@callback
-def update_items(
+async def async_add_items(
     coordinator: LinksysDataUpdateCoordinator,
     async_add_entities: AddEntitiesCallback,
     tracked: dict[str, LinksysDataUpdateCoordinatorTracker],
+    macs: Iterable[str],
 ) -> None:
-    """Update tracked device state from the hub."""
+    """Add trackers for devices in chunks, yielding to the event loop in between."""
     new_tracked: list[LinksysDataUpdateCoordinatorTracker] = []
-    for mac, device in coordinator.api.devices.items():
-        if mac not in tracked:
-            tracked[mac] = LinksysDataUpdateCoordinatorTracker(device, coordinator)
-            new_tracked.append(tracked[mac])
-
-    async_add_entities(new_tracked)
+    for mac in macs:
+        if mac in tracked or (device := coordinator.api.devices.get(mac)) is None:
+            continue
+        tracked[mac] = LinksysDataUpdateCoordinatorTracker(device, coordinator)
+        new_tracked.append(tracked[mac])
+        if len(new_tracked) >= ENTITY_CHUNK_SIZE:
+            async_add_entities(new_tracked)
+            new_tracked = []
+            await asyncio.sleep(0)
+
+    if new_tracked:
+        async_add_entities(new_tracked)
 
 class LinksysDataUpdateCoordinatorTracker(
     CoordinatorEntity[LinksysDataUpdateCoordinator], ScannerEntity
@@ -81,16 +105,22 @@ class LinksysDataUpdateCoordinatorTracker(
         self._attr_name = device.name
         self._attr_unique_id = device.mac
 
+    async def async_added_to_hass(self) -> None:
+        """Subscribe to updates for this device only.
+
+        Replaces the coordinator wide listener so entities are only updated
+        when their own device changes.
+        """
+        self.async_on_remove(
+            self.coordinator.async_add_device_listener(
+                self.device.mac, self._handle_coordinator_update
+            )
+        )
+
     @property
     def is_connected(self) -> bool:
         """Return true if the client is connected to the network."""
-        if (
-            self.device.last_seen
-            and (dt_util.utcnow() - self.device.last_seen)
-            < self.coordinator.option_detection_time
-        ):
-            return True
-        return False
+        return self.device.mac in self.coordinator.api.home
 
     @property
     def source_type(self) -> SourceType:
@@ -115,4 +145,8 @@ class LinksysDataUpdateCoordinatorTracker(
     @property
     def extra_state_attributes(self) -> dict[str, Any] | None:
         """Return the device state attributes."""
-        return self.device.attrs if self.is_connected else None
+        if not self.is_connected:
+            return None
+        if (node := self.coordinator.api.topology.node_of(self.device)) is None:
+            return self.device.attrs
+        return {**self.device.attrs, "mesh_node": node.name}
@@ -0,0 +1,65 @@
+"""Diagnostics support for Linksys."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD, CONF_USERNAME
+from homeassistant.core import HomeAssistant
+
+from .const import DATA_SCHEDULER, DOMAIN
+from .hub import LinksysDataUpdateCoordinator
+
+TO_REDACT = {CONF_PASSWORD, CONF_USERNAME, "serial_number"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, config_entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: LinksysDataUpdateCoordinator = hass.data[DOMAIN][
+        config_entry.entry_id
+    ]
+    data = coordinator.api
+
+    return async_redact_data(
+        {
+            "entry": {
+                "data": dict(config_entry.data),
+                "options": dict(config_entry.options),
+            },
+            "router": {
+                "manufacturer": data.manufacturer,
+                "model": data.model,
+                "firmware": data.firmware,
+                "capabilities": data.api.capabilities,
+                "serial_number": data.serial_number,
+            },
+            "polling": {
+                "current_interval": coordinator.current_interval,
+                "circuit_state": coordinator.circuit_state,
+                "schedule_lag": coordinator.schedule_lag,
+                "last_update_success": coordinator.last_update_success,
+                "revision": data.revision,
+                "cycles": data.cycle_stats.as_dict(),
+            },
+            "devices": {
+                "known": len(data.all_devices),
+                "tracked": len(data.devices),
+                "connected": len(data.connected),
+                "home": len(data.home),
+                "evicted": data.evicted_total,
+            },
+            "mesh": [
+                {
+                    **node.as_dict(),
+                    "clients": len(data.topology.clients(node)),
+                }
+                for node in data.topology.nodes.values()
+            ],
+            "requests": coordinator.request_stats.as_dict(),
+            "fleet": hass.data[DOMAIN][DATA_SCHEDULER].as_dict(),
+        },
+        TO_REDACT,
+    )
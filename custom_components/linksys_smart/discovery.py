@@ -0,0 +1,83 @@
+"""Discovery of Linksys routers on the local network."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+import ipaddress
+import logging
+from typing import Any
+
+from aiohttp import ClientError, ClientSession, ClientTimeout
+
+from .const import DISCOVERY_CONCURRENCY, DISCOVERY_MAX_HOSTS, DISCOVERY_TIMEOUT
+from .controller import (
+    LINKSYS_JNAP_ACTION_HEADER,
+    LINKSYS_JNAP_ACTION_URL,
+    LINKSYS_JNAP_ENDPOINT,
+    LinksysError,
+    json_loads,
+    single_action_output,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def subnet_hosts(subnet: str) -> list[str]:
+    """Return the host addresses of a subnet.
+
+    Raises ValueError for an invalid subnet or one with more than
+    DISCOVERY_MAX_HOSTS hosts.
+    """
+    network = ipaddress.ip_network(subnet, strict=False)
+    if network.num_addresses > DISCOVERY_MAX_HOSTS + 2:
+        raise ValueError(f"{subnet} has more than {DISCOVERY_MAX_HOSTS} hosts")
+    return [str(host) for host in network.hosts()]
+
+
+async def async_probe(
+    session: ClientSession, host: str, timeout: float = DISCOVERY_TIMEOUT
+) -> dict[str, Any] | None:
+    """Return the router details of a host, or None if it is not a JNAP router.
+
+    `core/GetDeviceInfo` does not need credentials, so any router answers it.
+    """
+    try:
+        async with session.post(
+            f"http://{host}{LINKSYS_JNAP_ENDPOINT}",
+            headers={
+                LINKSYS_JNAP_ACTION_HEADER: f"{LINKSYS_JNAP_ACTION_URL}/core/GetDeviceInfo"
+            },
+            json={},
+            timeout=ClientTimeout(total=timeout),
+        ) as res:
+            if res.status != 200:
+                return None
+            output = single_action_output(
+                json_loads(await res.read()), "core/GetDeviceInfo"
+            )
+    except (asyncio.TimeoutError, ClientError, ValueError, LinksysError):
+        return None
+
+    if not output.get("serialNumber"):
+        return None
+    return output
+
+
+async def async_scan(
+    session: ClientSession,
+    hosts: Iterable[str],
+    concurrency: int = DISCOVERY_CONCURRENCY,
+    timeout: float = DISCOVERY_TIMEOUT,
+) -> dict[str, dict[str, Any]]:
+    """Probe hosts concurrently, returning the router details of each hit."""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def probe(host: str) -> dict[str, Any] | None:
+        async with semaphore:
+            return await async_probe(session, host, timeout)
+
+    hosts = list(hosts)
+    results = await asyncio.gather(*(probe(host) for host in hosts))
+    found = {host: info for host, info in zip(hosts, results) if info is not None}
+    _LOGGER.debug("Found %s of %s hosts answering JNAP", len(found), len(hosts))
+    return found
@@ -1,104 +1,648 @@
 """The Linksys router class."""
 
-from datetime import timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
+from collections.abc import Iterable
+import contextlib
+import heapq
 import logging
+import time
 from typing import Any
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import device_registry as dr
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.helpers.storage import Store
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+import homeassistant.util.dt as dt_util
 
 from .const import (
+    CONF_CONSECUTIVE_HITS,
+    CONF_CONSECUTIVE_MISSES,
     CONF_DETECTION_TIME,
+    CONF_RETENTION_DAYS,
+    CONF_RETENTION_MAX_DEVICES,
+    CONF_SCAN_INTERVAL_MAX,
+    CONF_SCAN_INTERVAL_MIN,
+    DEFAULT_CONSECUTIVE_HITS,
+    DEFAULT_CONSECUTIVE_MISSES,
     DEFAULT_DETECTION_TIME,
-    DOMAIN
+    DEFAULT_RETENTION_DAYS,
+    DEFAULT_RETENTION_MAX_DEVICES,
+    DEFAULT_SCAN_INTERVAL_MAX,
+    DEFAULT_SCAN_INTERVAL_MIN,
+    DETAILS_REFRESH_INTERVAL,
+    DOMAIN,
+    EVENT_DEBOUNCE_COOLDOWN,
+    EVENT_DEVICES_CHANGED,
+    METRICS_MAX_CLIENTS,
+    METRICS_WINDOW,
+    MIN_SCAN_INTERVAL,
+    NODE_MAX_CONCURRENT,
+    NODE_REFRESH_INTERVAL,
+    OFFLOAD_DEVICE_COUNT,
+    QUIET_BACKOFF,
+    RETENTION_CHECK_INTERVAL,
+    SLOW_RESPONSE_THRESHOLD,
+    SNAPSHOT_SAVE_DELAY,
+    SNAPSHOT_SEEN_INTERVAL,
+    SNAPSHOT_VERSION,
+    STRUGGLING_BACKOFF,
 )
-from .controller import LinksysController
-from .device import Device
+from .capabilities import CapabilityCache
+from .controller import (
+    CircuitOpenError,
+    LinksysController,
+    LinksysError,
+    UnkownActionError,
+)
+from .device import ATTR_SLUGS, Device
+from .index import DeviceIndex, device_mac, normalize_mac
+from .metrics import MetricsStore
+from .presence import PresenceEngine
+from .scheduler import FleetScheduler
+from .stats import CycleStats, Instrumentation
+from .topology import MeshNode, MeshTopology
 
 _LOGGER = logging.getLogger(__name__)
 
+# Sort key of devices never seen connected, which are evicted first
+_NEVER_SEEN = datetime.min.replace(tzinfo=timezone.utc)
+
+Derived = tuple[int | None, tuple[str | None, str | None, str | None, dict[str, Any]] | None]
+
+def prepare_devices(
+    devices: list[dict[str, Any]], known: dict[str, Device]
+) -> dict[str, Derived]:
+    """Key router devices by MAC and derive their values.
+
+    Values are only derived for devices whose revision differs from the
+    known device, otherwise None is given. Nothing is modified, so this can
+    run in an executor while the event loop reads the known devices.
+    """
+    prepared: dict[str, Derived] = {}
+    for params in devices:
+        if not (mac := device_mac(params)):
+            continue
+        revision = params.get("lastChangeRevision")
+        if (
+            revision is not None
+            and (device := known.get(mac)) is not None
+            and device.revision == revision
+        ):
+            prepared[mac] = (revision, None)
+        else:
+            prepared[mac] = (revision, Device.derive(params))
+    return prepared
+
+def _is_online(mac: str, derived: tuple, online: set[str]) -> bool:
+    """Return whether a device has an interface among the online MAC addresses."""
+    if mac in online:
+        return True
+    return any(
+        normalize_mac(interface.get("macAddress")) in online
+        for interface in derived[3].get(ATTR_SLUGS["knownInterfaces"], [])
+    )
+
 class LinksysData:
     """Handle all communication with the Linksys API."""
 
     def __init__(
-        self, hass: HomeAssistant, config_entry: ConfigEntry, api: LinksysController
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        api: LinksysController,
+        store: Store | None = None,
     ) -> None:
-        """Initialize the Linksys Client."""
+        """Initialize the Linksys Client.
+
+        The snapshot is kept in `store`, by default the entry's own Store.
+        """
         self.hass = hass
         self.config_entry = config_entry
         self.api = api
-        self.all_devices: dict[str, dict[str, Any]] = {}
+        self.all_devices: dict[str, Device] = {}
+        self.index = DeviceIndex()
+        self.topology = MeshTopology(self.index)
+        self._next_node_refresh: datetime | None = None
+        self.revision: int = 0
+        self.connected: set[str] = set()
+        self.presence = PresenceEngine(
+            timedelta(
+                seconds=config_entry.options.get(
+                    CONF_DETECTION_TIME, DEFAULT_DETECTION_TIME
+                )
+            ),
+            hits=config_entry.options.get(
+                CONF_CONSECUTIVE_HITS, DEFAULT_CONSECUTIVE_HITS
+            ),
+            misses=config_entry.options.get(
+                CONF_CONSECUTIVE_MISSES, DEFAULT_CONSECUTIVE_MISSES
+            ),
+        )
+        self.changed: set[str] = set()
+        # Devices that came home, went away and were first seen last poll
+        self.joined: set[str] = set()
+        self.left: set[str] = set()
+        self.added: set[str] = set()
+        self.evicted: set[str] = set()
+        self.evicted_total = 0
+        # Evicted devices still listed by the router, kept out of the known
+        # devices until they connect again
+        self.tombstones: set[str] = set()
+        self.initial_sync = False
+        self.retention_age = timedelta(
+            days=config_entry.options.get(CONF_RETENTION_DAYS, DEFAULT_RETENTION_DAYS)
+        )
+        self.retention_count: int = config_entry.options.get(
+            CONF_RETENTION_MAX_DEVICES, DEFAULT_RETENTION_MAX_DEVICES
+        )
+        self._next_retention_check: datetime | None = None
+        self.cycle_stats = CycleStats()
+        self.metrics = MetricsStore(METRICS_WINDOW, METRICS_MAX_CLIENTS)
         self.devices: dict[str, Device] = {}
         self.manufacturer: str = ""
         self.hostname: str = ""
         self.model: str = ""
         self.firmware: str = ""
         self.serial_number: str = ""
+        # JNAP services listed by the router, naming the action versions it has
+        self.services: list[str] = []
+        self._store: Store = store or Store(
+            hass,
+            SNAPSHOT_VERSION,
+            f"{DOMAIN}.{config_entry.entry_id}",
+            atomic_writes=True,
+        )
+        self._save_scheduled = False
+        # Whether the snapshot is out of date in more than last seen times,
+        # and whether those are
+        self._snapshot_changed = False
+        self._seen_changed = False
+        self._next_seen_save = time.monotonic() + SNAPSHOT_SEEN_INTERVAL
+        # Router details are fetched alongside the first poll after setup,
+        # then now and then and after a reboot to pick up firmware updates
+        self.details_pending = True
+        self.details_changed = False
+        self._next_details_refresh: float | None = None
+        # Whether the last poll found the device revision reset
+        self.revision_reset = False
 
-    @staticmethod
-    def load_mac(devices: list[dict[str, Any]]) -> dict[str, dict[str, Any]]:
-        """Load dictionary using MAC address as key."""
-        mac_devices = {}
-        for device in devices:
-            if mac := device.get("macAddress"):
-                mac_devices[mac] = device
-                continue
-            if len(connections := device.get("knownInterfaces", [])) == 1:
-                if "macAddress" in connections[0]:
-                    mac = connections[0]["macAddress"]
-                    mac_devices[mac] = device
-        return mac_devices
-
-    async def async_get_linksys_details(self) -> None:
-        """Get Linksys Router info."""
-        if result := await self.api.async_get_device_info():
-            self.hostname = result.get("description")
-            self.manufacturer = result.get("manufacturer")
-            self.model = result.get("modelNumber")
-            self.firmware = result.get("firmwareVersion")
-            self.serial_number = result.get("serialNumber")
-
-    async def async_update_devices(self) -> None:
-        """Get list of devices with latest status."""
-        if devices := await self.api.async_get_devices():
-            self.all_devices = self.load_mac(devices)
-
-        if not self.all_devices:
+    def merge_devices(
+        self,
+        devices: dict[str, Derived],
+        deleted_ids: list[str],
+        full: bool = False,
+        online: set[str] | None = None,
+    ) -> set[str]:
+        """Merge changed and deleted devices into the known device list.
+
+        `devices` are prepared with `prepare_devices()`. With `full` they
+        replace the known list, otherwise they are applied as changes.
+        Evicted devices are only added back once connected, which is when
+        an interface MAC address is among `online`. Returns the MAC
+        addresses whose values were added, changed or removed.
+        """
+        changed: set[str] = set()
+        added: set[str] = set()
+        seen: set[str] | None = set() if full else None
+
+        for device_id in deleted_ids:
+            if (mac := self.index.lookup_device_id(device_id)) is not None:
+                self.all_devices.pop(mac, None)
+                self.index.remove(mac)
+                changed.add(mac)
+
+        for mac, (revision, derived) in devices.items():
+            if (device := self.devices.get(mac)) is None:
+                if derived is None:
+                    continue
+                if mac in self.tombstones:
+                    if not online or not _is_online(mac, derived, online):
+                        continue
+                    self.tombstones.discard(mac)
+                device = self.devices[mac] = Device(mac)
+                device.apply(revision, derived)
+                changed.add(mac)
+                added.add(mac)
+            elif derived is not None and device.apply(revision, derived):
+                changed.add(mac)
+            if mac in changed or mac not in self.all_devices:
+                self.index.update(mac, device)
+            self.all_devices[mac] = device
+            if seen is not None:
+                seen.add(mac)
+
+        if seen is not None:
+            for mac in self.all_devices.keys() - seen:
+                del self.all_devices[mac]
+                self.index.remove(mac)
+                changed.add(mac)
+            # Forget evicted devices the router no longer lists either
+            self.tombstones &= devices.keys()
+
+        self.added = added
+        return changed
+
+    def evict_devices(self, now: datetime) -> set[str]:
+        """Forget devices past the retention age or beyond the retention count.
+
+        Devices not seen for `retention_age` are evicted, then the least
+        recently seen until at most `retention_count` remain, starting with
+        those never seen connected. Devices never seen connected are aged
+        from when they were first known. Devices that are home or connected
+        are kept, and count towards `retention_count` before any other. A
+        zero age or count disables that limit. Evicted devices are
+        tombstoned so that a resync does not add them back. Returns the
+        evicted MAC addresses.
+        """
+        keep = self.presence.home | self.connected
+        evicted: set[str] = set()
+
+        if self.retention_age:
+            cutoff = now - self.retention_age
+            evicted = {
+                mac
+                for mac, device in self.devices.items()
+                if mac not in keep
+                and (device.last_seen or device.first_seen) < cutoff
+            }
+
+        if (
+            self.retention_count
+            and (
+                excess := len(self.devices)
+                - len(evicted)
+                - max(self.retention_count, len(keep))
+            )
+            > 0
+        ):
+            evicted.update(
+                heapq.nsmallest(
+                    excess,
+                    (
+                        mac
+                        for mac in self.devices
+                        if mac not in keep and mac not in evicted
+                    ),
+                    key=lambda mac: self.devices[mac].last_seen or _NEVER_SEEN,
+                )
+            )
+
+        self.tombstones.update(evicted)
+        for mac in evicted:
+            del self.devices[mac]
+            self.all_devices.pop(mac, None)
+            self.index.remove(mac)
+            self.presence.discard(mac)
+            self.metrics.evict(mac)
+
+        self.evicted_total += len(evicted)
+        if evicted:
+            _LOGGER.debug("Evicted %s devices, %s remain", len(evicted), len(self.devices))
+        return evicted
+
+    async def async_close(self) -> None:
+        """Close the connection to the router."""
+        if self._save_scheduled or self._seen_changed:
+            await self._store.async_save(self._snapshot())
+        await self.api.async_close()
+
+    async def async_load_snapshot(self) -> bool:
+        """Load the last known router details and devices.
+
+        Returns whether a snapshot was found.
+        """
+        if not (data := await self._store.async_load()):
+            return False
+
+        router = data.get("router", {})
+        self.hostname = router.get("hostname", "")
+        self.manufacturer = router.get("manufacturer", "")
+        self.model = router.get("model", "")
+        self.firmware = router.get("firmware", "")
+        self.serial_number = router.get("serial_number", "")
+
+        now = dt_util.utcnow()
+        for mac, snapshot in data.get("devices", {}).items():
+            device = self.devices[mac] = self.all_devices[mac] = Device.from_snapshot(
+                mac, snapshot
+            )
+            self.index.update(mac, device)
+            self.presence.restore(mac, device.last_seen, now)
+        self.tombstones = set(data.get("tombstones", []))
+        self.topology.update(self.all_devices, self.all_devices)
+
+        return True
+
+    @callback
+    def async_schedule_snapshot(self) -> None:
+        """Save the router details and devices after a delay.
+
+        Last seen times change on every poll, so changes to them alone are
+        only saved every SNAPSHOT_SEEN_INTERVAL seconds and on close.
+        """
+        if self._save_scheduled or not self.serial_number:
+            return
+        if not self._snapshot_changed and (
+            not self._seen_changed or time.monotonic() < self._next_seen_save
+        ):
             return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._snapshot, SNAPSHOT_SAVE_DELAY)
 
-        if conns := await self.api.async_get_network_connections():
-            connections = self.load_mac(conns)
+    def _snapshot(self) -> dict[str, Any]:
+        """Return the data to save."""
+        self._save_scheduled = False
+        self._snapshot_changed = self._seen_changed = False
+        self._next_seen_save = time.monotonic() + SNAPSHOT_SEEN_INTERVAL
+        return {
+            "router": {
+                "hostname": self.hostname,
+                "manufacturer": self.manufacturer,
+                "model": self.model,
+                "firmware": self.firmware,
+                "serial_number": self.serial_number,
+            },
+            "devices": {
+                mac: device.as_snapshot() for mac, device in self.all_devices.items()
+            },
+            "tombstones": list(self.tombstones),
+        }
 
-        for mac, params in self.all_devices.items():
-            if mac not in self.devices:
-                self.devices[mac] = Device(mac, params)
-            else:
-                self.devices[mac].update(params=params)
+    @callback
+    def set_linksys_details(self, result: dict[str, Any]) -> bool:
+        """Set Linksys Router info, returning whether it changed."""
+        self.services = result.get("services") or []
+        details = (
+            result.get("description"),
+            result.get("manufacturer"),
+            result.get("modelNumber"),
+            result.get("firmwareVersion"),
+            result.get("serialNumber"),
+        )
+        if details == (
+            self.hostname, self.manufacturer, self.model, self.firmware, self.serial_number
+        ):
+            return False
+        (
+            self.hostname,
+            self.manufacturer,
+            self.model,
+            self.firmware,
+            self.serial_number,
+        ) = details
+        self._snapshot_changed = True
+        return True
+
+    async def async_get_linksys_details(self) -> bool:
+        """Get Linksys Router info, returning whether it changed."""
+        if result := await self.api.async_get_device_info():
+            self._next_details_refresh = time.monotonic() + DETAILS_REFRESH_INTERVAL
+            return self.set_linksys_details(result)
+        return False
+
+    @property
+    def home(self) -> set[str]:
+        """Return the MAC addresses of devices that are home."""
+        return self.presence.home
+
+    def last_seen(self, mac: str) -> datetime | None:
+        """Return when a device was last seen."""
+        if (device := self.devices.get(mac)) is None:
+            return None
+        return device.last_seen
+
+    @callback
+    def async_expire_presence(self, now: datetime) -> set[str]:
+        """Mark devices away whose detection time ran out between polls."""
+        return self.presence.expire(self.last_seen, now) & self.devices.keys()
+
+    def next_presence_expiry(self) -> datetime | None:
+        """Return when the next device will leave if it is not seen again."""
+        return self.presence.next_expiry(self.last_seen)
+
+    async def async_update_nodes(self) -> None:
+        """Refresh the backhaul and health of the mesh nodes.
+
+        The router is asked for the backhaul of every node while each
+        satellite is asked for its own details, at most NODE_MAX_CONCURRENT
+        requests at a time.
+        """
+        semaphore = asyncio.Semaphore(NODE_MAX_CONCURRENT)
+
+        async def update_backhaul() -> None:
+            async with semaphore:
+                try:
+                    backhaul = await self.api.async_get_backhaul_info()
+                except UnkownActionError:
+                    # Not a mesh capable firmware, so stop asking
+                    self.api.capabilities["nodes/diagnostics/GetBackhaulInfo"] = None
+                    return
+                except LinksysError as err:
+                    _LOGGER.debug("Error getting mesh backhaul: %s", err)
+                    return
+            by_id = {info.get("deviceUUID"): info for info in backhaul}
+            for node in self.topology.nodes.values():
+                node.backhaul = by_id.get(node.device.device_id)
+
+        async def update_node(node: MeshNode) -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    node.info = await self.api.async_get_node_info(
+                        node.device.ip_address
+                    )
+                except LinksysError as err:
+                    _LOGGER.debug("Error getting mesh node %s: %s", node.name, err)
+                    node.reachable = False
+                    return
+            node.reachable = True
+            node.latency = time.perf_counter() - start
+
+        await asyncio.gather(
+            update_backhaul(),
+            *(
+                update_node(node)
+                for node in self.topology.satellites
+                if node.device.ip_address
+            ),
+        )
+
+    async def async_update_devices(self) -> bool:
+        """Get list of devices with latest status.
+
+        Returns whether the device list or the set of connected devices changed.
+        """
+        start = time.perf_counter()
+        decode_start = self.api.loop_time
+        self.initial_sync = not self.all_devices
+        if self._next_details_refresh is not None and time.monotonic() >= (
+            self._next_details_refresh
+        ):
+            self.details_pending = True
+        output, conns, info = await self.api.async_get_devices_and_connections(
+            self.revision, device_info=self.details_pending
+        )
+        revision = output.get("revision", 0)
+
+        self.revision_reset = bool(self.revision and revision < self.revision)
+        if self.revision_reset:
+            # Router revision went backwards (reboot or firmware update), so
+            # our delta base is meaningless. Start again from scratch, along
+            # with the details the firmware may have changed.
+            _LOGGER.debug(
+                "Device revision reset from %s to %s, resyncing", self.revision, revision
+            )
+            self.revision = 0
+            self.details_pending = True
+            output, conns, info = await self.api.async_get_devices_and_connections(
+                device_info=True
+            )
+            revision = output.get("revision", 0)
+
+        self.details_changed = False
+        if info:
+            self.details_changed = self.set_linksys_details(info)
+            self.details_pending = False
+            self._next_details_refresh = time.monotonic() + DETAILS_REFRESH_INTERVAL
+
+        fetched = time.perf_counter()
+        blocking = self.api.loop_time - decode_start
+        changes = output.get("devices", [])
+        deleted = output.get("deletedDeviceIDs", [])
+        if len(changes) >= OFFLOAD_DEVICE_COUNT:
+            # Derive device values off the event loop, apply them on it
+            prepared = await self.hass.async_add_executor_job(
+                prepare_devices, changes, self.devices
+            )
+            resumed = time.perf_counter()
+        else:
+            prepared = prepare_devices(changes, self.devices)
+            resumed = fetched
+        online = (
+            {normalize_mac(conn.get("macAddress")) for conn in conns}
+            if self.tombstones
+            else None
+        )
+        updated = self.merge_devices(
+            prepared, deleted, full=not self.revision, online=online
+        )
+        self.topology.update(updated, self.all_devices)
+        if not revision:
+            # Fall back to the newest device change if the router omits it
+            revision = max(
+                (device.revision or 0 for device in self.all_devices.values()),
+                default=0,
+            )
+        self.revision = revision
+
+        connections = {
+            mac: conn
+            for conn in conns
+            if (mac := self.index.lookup_mac(conn.get("macAddress"))) in self.all_devices
+        }
+        connected = set(connections)
+        self.metrics.update(connections)
 
-            active = True
+        for mac in connected:
+            self.devices[mac].update(active=True)
 
-            if not mac in connections:
-                active = False
-            
-            self.devices[mac].update(active=active)
+        now = dt_util.utcnow()
+        presence = self.presence.update(connected, self.last_seen, now)
+        changed = bool(updated) or connected != self.connected
+        self.connected = connected
+
+        # Age limits only need checking now and then, the count on every growth
+        self.evicted = set()
+        if (
+            self._next_retention_check is None
+            or now >= self._next_retention_check
+            or (
+                self.retention_count
+                and len(self.devices)
+                > max(self.retention_count, len(self.presence.home | connected))
+            )
+        ):
+            self.evicted = self.evict_devices(now)
+            self._next_retention_check = now + timedelta(
+                seconds=RETENTION_CHECK_INTERVAL
+            )
+            self.added -= self.evicted
+            self.topology.update(self.evicted, self.all_devices)
+
+        self.changed = (updated | presence) & self.devices.keys()
+        if updated or presence or self.evicted:
+            self._snapshot_changed = True
+        if connected:
+            self._seen_changed = True
+        self.joined = presence & self.presence.home
+        self.left = presence - self.presence.home
+
+        processed = time.perf_counter()
+        if self.topology.satellites and (
+            self._next_node_refresh is None or now >= self._next_node_refresh
+        ):
+            await self.async_update_nodes()
+            self._next_node_refresh = now + timedelta(seconds=NODE_REFRESH_INTERVAL)
+
+        end = time.perf_counter()
+        self.cycle_stats.record(
+            fetch=fetched - start,
+            process=processed - fetched,
+            blocking=blocking + processed - resumed,
+            nodes=end - processed,
+            total=end - start,
+        )
+
+        return changed
 
 class LinksysDataUpdateCoordinator(DataUpdateCoordinator[None]):
     """Linksys Router Object."""
 
     def __init__(
-        self, hass: HomeAssistant, config_entry: ConfigEntry, api: LinksysController
+        self,
+        hass: HomeAssistant,
+        config_entry: ConfigEntry,
+        api: LinksysController,
+        scheduler: FleetScheduler | None = None,
+        capabilities: CapabilityCache | None = None,
     ) -> None:
         """Initialize the Linksys Client."""
         self.hass = hass
         self.config_entry: ConfigEntry = config_entry
         self._linksys_data = LinksysData(self.hass, self.config_entry, api)
+        self._scheduler = scheduler
+        self._capability_cache = capabilities
+        self._capabilities_checked = False
+        self._capabilities_probed = False
+        # Model and firmware the capabilities were loaded for
+        self._capabilities_key: tuple[str, str] | None = None
+        api.write_callback = self._async_writes_applied
+        self._next_due: float | None = None
+        self._device_listeners: dict[str, list[CALLBACK_TYPE]] = {}
+        self._last_dispatch_success = True
+        self._unsub_presence: CALLBACK_TYPE | None = None
+        self._pending_events: dict[str, set[str]] = {
+            "joined": set(),
+            "left": set(),
+            "new": set(),
+        }
+        self._event_debouncer = Debouncer(
+            hass,
+            _LOGGER,
+            cooldown=EVENT_DEBOUNCE_COOLDOWN,
+            immediate=False,
+            function=self._async_fire_devices_changed,
+        )
         super().__init__(
             self.hass,
             _LOGGER,
             name=f"{DOMAIN} - {self.host}",
-            update_interval=timedelta(seconds=10),
+            update_interval=self.option_scan_interval_min,
         )
 
     @property
@@ -142,14 +686,288 @@ class LinksysDataUpdateCoordinator(DataUpdateCoordinator[None]):
         return self._linksys_data
 
     @property
-    def option_detection_time(self) -> timedelta:
-        """Config entry option defining number of seconds from last seen to away."""
+    def option_scan_interval_min(self) -> timedelta:
+        """Config entry option defining the shortest polling interval."""
+        return timedelta(
+            seconds=max(
+                self.config_entry.options.get(
+                    CONF_SCAN_INTERVAL_MIN, DEFAULT_SCAN_INTERVAL_MIN
+                ),
+                MIN_SCAN_INTERVAL,
+            )
+        )
+
+    @property
+    def option_scan_interval_max(self) -> timedelta:
+        """Config entry option defining the longest polling interval."""
         return timedelta(
             seconds=self.config_entry.options.get(
-                CONF_DETECTION_TIME, DEFAULT_DETECTION_TIME
+                CONF_SCAN_INTERVAL_MAX, DEFAULT_SCAN_INTERVAL_MAX
             )
         )
 
+    @property
+    def circuit_state(self) -> str:
+        """Return the state of the circuit breaker for the router."""
+        return self._linksys_data.api.breaker.state
+
+    @property
+    def request_stats(self) -> Instrumentation:
+        """Return the request statistics for the router."""
+        return self._linksys_data.api.stats
+
+    @property
+    def current_interval(self) -> float:
+        """Return the current polling interval in seconds."""
+        return self.update_interval.total_seconds()
+
+    def _adjust_interval(self, changed: bool, duration: float | None = None) -> None:
+        """Adapt the polling interval to network activity and router health.
+
+        Changes reset the interval to the minimum so joins are seen quickly,
+        while quiet periods back off exponentially, and slow responses and
+        errors back off faster still.
+        """
+        minimum = self.option_scan_interval_min
+        maximum = max(self.option_scan_interval_max, minimum)
+        slow = duration is None or duration > SLOW_RESPONSE_THRESHOLD
+
+        if slow:
+            interval = self.update_interval * STRUGGLING_BACKOFF
+        elif changed:
+            interval = minimum
+        else:
+            interval = self.update_interval * QUIET_BACKOFF
+
+        self.update_interval = min(max(interval, minimum), maximum)
+
+    @callback
+    def async_add_device_listener(
+        self, mac: str, update_callback: CALLBACK_TYPE
+    ) -> CALLBACK_TYPE:
+        """Listen for updates to a single device."""
+        self._device_listeners.setdefault(mac, []).append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            """Remove update listener."""
+            listeners = self._device_listeners.get(mac, [])
+            listeners.remove(update_callback)
+            if not listeners:
+                self._device_listeners.pop(mac, None)
+
+        return remove_listener
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all hub listeners and only the devices that changed."""
+        super().async_update_listeners()
+
+        if self.last_update_success != self._last_dispatch_success:
+            # Availability changed, so every device needs to write state
+            macs = list(self._device_listeners)
+        elif self.last_update_success:
+            macs = self._linksys_data.changed
+        else:
+            macs = []
+        self._last_dispatch_success = self.last_update_success
+
+        self._async_dispatch(macs)
+
+    @callback
+    def _async_dispatch(self, macs: Iterable[str]) -> None:
+        """Update the listeners of the given devices."""
+        for mac in macs:
+            for update_callback in list(self._device_listeners.get(mac, [])):
+                update_callback()
+
+    @callback
+    def _async_queue_events(
+        self,
+        joined: Iterable[str] = (),
+        left: Iterable[str] = (),
+        new: Iterable[str] = (),
+    ) -> None:
+        """Gather device changes into the next devices changed event."""
+        pending = self._pending_events
+        # A device that joins and leaves before the event fires has not changed
+        for mac in joined:
+            if mac in pending["left"]:
+                pending["left"].discard(mac)
+            else:
+                pending["joined"].add(mac)
+        for mac in left:
+            if mac in pending["joined"]:
+                pending["joined"].discard(mac)
+            else:
+                pending["left"].add(mac)
+        pending["new"].update(new)
+
+        if any(pending.values()):
+            self.hass.async_create_task(self._event_debouncer.async_call())
+
+    @callback
+    def _async_fire_devices_changed(self) -> None:
+        """Fire one event with all device changes gathered since the last."""
+        pending = self._pending_events
+        if not any(pending.values()):
+            return
+        self.hass.bus.async_fire(
+            EVENT_DEVICES_CHANGED,
+            {
+                "entry_id": self.config_entry.entry_id,
+                "host": self.host,
+                **{key: sorted(macs) for key, macs in pending.items()},
+            },
+        )
+        for macs in pending.values():
+            macs.clear()
+
+    @callback
+    def _async_writes_applied(self) -> None:
+        """Pick up the changes made by a batch of writes with one delta refresh."""
+        self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _async_schedule_presence_timer(self) -> None:
+        """Wake up when the next device would leave if it is not seen again."""
+        if self._unsub_presence:
+            self._unsub_presence()
+            self._unsub_presence = None
+        if (expiry := self._linksys_data.next_presence_expiry()) is not None:
+            self._unsub_presence = async_track_point_in_utc_time(
+                self.hass, self._async_presence_expired, expiry
+            )
+
+    @callback
+    def _async_presence_expired(self, now: datetime) -> None:
+        """Update devices whose detection time ran out between polls."""
+        self._unsub_presence = None
+        expired = self._linksys_data.async_expire_presence(now)
+        self._async_dispatch(expired)
+        self._async_queue_events(left=expired)
+        self._async_schedule_presence_timer()
+
+    async def async_close(self) -> None:
+        """Stop timers and close the connection to the router."""
+        if self._unsub_presence:
+            self._unsub_presence()
+            self._unsub_presence = None
+        self._event_debouncer.async_cancel()
+        await self._linksys_data.async_close()
+
+    @property
+    def schedule_lag(self) -> float | None:
+        """Return how late the last poll started, in seconds."""
+        if self._scheduler is None:
+            return None
+        if (schedule := self._scheduler.entries.get(self.config_entry.entry_id)) is None:
+            return None
+        return schedule.lag
+
+    async def _async_update_devices(self) -> bool:
+        """Update devices, making sure the actions used suit the firmware."""
+        data = self._linksys_data
+        try:
+            changed = await data.async_update_devices()
+        except UnkownActionError:
+            if self._capabilities_probed:
+                raise
+            # The default, cached or listed actions are not supported, so
+            # find out which are. The firmware may have been updated, so the
+            # details are refreshed first to key the cache by the new one.
+            # Only probe the router if they are unchanged, as then its service
+            # list or the cache are wrong.
+            details_changed = await data.async_get_linksys_details()
+            await self._async_load_capabilities(
+                probe=self._capabilities_checked and not details_changed
+            )
+            changed = await data.async_update_devices()
+            data.details_changed |= details_changed
+
+        if data.revision_reset and self._capabilities_key is not None:
+            # A reboot may come with new firmware, so do not trust what was
+            # cached for the one before it
+            if self._capability_cache is not None:
+                await self._capability_cache.async_remove(*self._capabilities_key)
+            await self._async_load_capabilities()
+        elif data.details_changed or not self._capabilities_checked:
+            await self._async_load_capabilities()
+
+        return changed
+
+    async def _async_load_capabilities(self, probe: bool = False) -> None:
+        """Use the cached actions for this firmware, discovering them if unknown.
+
+        With `probe`, the cache and the router's service list are not
+        trusted and each action is probed.
+        """
+        data = self._linksys_data
+        self._capabilities_checked = True
+        self._capabilities_probed = probe or not data.services
+        self._capabilities_key = (data.model, data.firmware) if data.model else None
+        services = None if probe else data.services
+        if self._capability_cache is None or not data.model:
+            await data.api.async_discover_capabilities(services)
+            return
+
+        if not probe and (
+            cached := await self._capability_cache.async_get(data.model, data.firmware)
+        ) is not None:
+            data.api.capabilities = cached
+            return
+
+        capabilities = await data.api.async_discover_capabilities(services)
+        await self._capability_cache.async_set(data.model, data.firmware, capabilities)
+
     async def _async_update_data(self) -> None:
         """Update Linksys devices information."""
-        await self._linksys_data.async_update_devices()
+        slot = (
+            self._scheduler.slot(self.config_entry.entry_id, self._next_due)
+            if self._scheduler
+            else contextlib.nullcontext()
+        )
+        async with slot:
+            start = time.monotonic()
+            try:
+                changed = await self._async_update_devices()
+            except CircuitOpenError as err:
+                # Nothing will get through until the circuit resets, so back off fully
+                self.update_interval = max(
+                    self.option_scan_interval_max, self.option_scan_interval_min
+                )
+                raise UpdateFailed(str(err)) from err
+            except LinksysError as err:
+                self._adjust_interval(changed=False)
+                raise UpdateFailed(f"Error communicating with router: {err}") from err
+            else:
+                # Slow satellites must not make the router look slow
+                duration = time.monotonic() - start
+                duration -= self._linksys_data.cycle_stats.last.get("nodes", 0.0)
+                self._adjust_interval(changed, duration)
+            finally:
+                self._next_due = time.monotonic() + self.current_interval
+
+        self._async_schedule_presence_timer()
+        data = self._linksys_data
+        if not data.initial_sync:
+            # Everything is new on the first sync, which is not worth an event
+            self._async_queue_events(data.joined, data.left, data.added)
+        if data.details_changed:
+            self.async_update_router_device()
+        data.async_schedule_snapshot()
+
+    @callback
+    def async_update_router_device(self) -> None:
+        """Create or update the router in the device registry."""
+        if not self.serial_num:
+            return
+        device_registry = dr.async_get(self.hass)
+        device_registry.async_get_or_create(
+            config_entry_id=self.config_entry.entry_id,
+            connections={(DOMAIN, self.serial_num)},
+            manufacturer=self.manufacturer,
+            model=self.model,
+            name=self.hostname,
+            sw_version=self.firmware,
+        )
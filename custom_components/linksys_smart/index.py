@@ -0,0 +1,127 @@
+"""Device lookup indexes."""
+from __future__ import annotations
+
+from typing import Any
+
+from .device import ATTR_SLUGS, Device
+
+_HEX_DIGITS = frozenset("0123456789ABCDEF")
+
+
+def normalize_mac(mac: str | None) -> str | None:
+    """Return a MAC address as upper case, colon separated octets."""
+    if not mac:
+        return None
+    mac = mac.strip().upper().replace("-", ":").replace(".", "")
+    if ":" not in mac and len(mac) == 12 and _HEX_DIGITS.issuperset(mac):
+        mac = ":".join(mac[i : i + 2] for i in range(0, 12, 2))
+    return mac
+
+
+def device_mac(params: dict[str, Any]) -> str | None:
+    """Return the MAC address a device is tracked by.
+
+    This is the device's own MAC address if the router reports one, or
+    otherwise the first of its known interfaces.
+    """
+    if mac := params.get("macAddress"):
+        return normalize_mac(mac)
+    for interface in params.get("knownInterfaces", []):
+        if mac := interface.get("macAddress"):
+            return normalize_mac(mac)
+    return None
+
+
+class DeviceIndex:
+    """Secondary indexes over the devices known to the router.
+
+    Devices are keyed by the MAC address they are tracked by. Every interface
+    MAC, IP address, router device ID and parent node ID maps back to that
+    key. Entries are updated in place as devices change.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the indexes."""
+        self.by_mac: dict[str, str] = {}
+        self.by_ip: dict[str, str] = {}
+        self.by_device_id: dict[str, str] = {}
+        self.by_parent: dict[str, set[str]] = {}
+        self._keys: dict[
+            str, tuple[frozenset[str], frozenset[str], str | None, frozenset[str]]
+        ] = {}
+
+    @staticmethod
+    def _device_keys(
+        mac: str, device: Device
+    ) -> tuple[frozenset[str], frozenset[str], str | None, frozenset[str]]:
+        """Return the interface MACs, IPs, device ID and parents of a device."""
+        macs = {mac}
+        for interface in device.attrs.get(ATTR_SLUGS["knownInterfaces"], []):
+            if interface_mac := normalize_mac(interface.get("macAddress")):
+                macs.add(interface_mac)
+
+        ips = set()
+        parents = set()
+        for connection in device.attrs.get(ATTR_SLUGS["connections"], []):
+            if ip_address := connection.get("ipAddress"):
+                ips.add(ip_address)
+            if parent := connection.get("parentDeviceID"):
+                parents.add(parent)
+
+        return frozenset(macs), frozenset(ips), device.device_id, frozenset(parents)
+
+    def update(self, mac: str, device: Device) -> None:
+        """Add or refresh the index entries of a device."""
+        keys = self._device_keys(mac, device)
+        if self._keys.get(mac) == keys:
+            return
+        self.remove(mac)
+        self._keys[mac] = keys
+
+        macs, ips, device_id, parents = keys
+        for interface_mac in macs:
+            self.by_mac[interface_mac] = mac
+        for ip_address in ips:
+            self.by_ip[ip_address] = mac
+        if device_id:
+            self.by_device_id[device_id] = mac
+        for parent in parents:
+            self.by_parent.setdefault(parent, set()).add(mac)
+
+    def remove(self, mac: str) -> None:
+        """Remove the index entries of a device."""
+        if (keys := self._keys.pop(mac, None)) is None:
+            return
+
+        macs, ips, device_id, parents = keys
+        for interface_mac in macs:
+            if self.by_mac.get(interface_mac) == mac:
+                del self.by_mac[interface_mac]
+        for ip_address in ips:
+            if self.by_ip.get(ip_address) == mac:
+                del self.by_ip[ip_address]
+        if device_id and self.by_device_id.get(device_id) == mac:
+            del self.by_device_id[device_id]
+        for parent in parents:
+            if children := self.by_parent.get(parent):
+                children.discard(mac)
+                if not children:
+                    del self.by_parent[parent]
+
+    def lookup_mac(self, mac: str | None) -> str | None:
+        """Return the tracked MAC of the device owning an interface MAC."""
+        if (mac := normalize_mac(mac)) is None:
+            return None
+        return self.by_mac.get(mac)
+
+    def lookup_ip(self, ip_address: str) -> str | None:
+        """Return the tracked MAC of the device with an IP address."""
+        return self.by_ip.get(ip_address)
+
+    def lookup_device_id(self, device_id: str) -> str | None:
+        """Return the tracked MAC of the device with a router device ID."""
+        return self.by_device_id.get(device_id)
+
+    def children(self, parent_id: str) -> set[str]:
+        """Return the tracked MACs of devices connected through a node."""
+        return self.by_parent.get(parent_id, set())
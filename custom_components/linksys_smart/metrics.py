@@ -0,0 +1,133 @@
+"""Rolling per-client link metrics."""
+from __future__ import annotations
+
+from array import array
+import logging
+from typing import Any
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class RingBuffer:
+    """Fixed size buffer of the most recent samples."""
+
+    __slots__ = ("_values", "_index", "_count")
+
+    def __init__(self, size: int) -> None:
+        """Initialize the buffer."""
+        self._values = array("f", bytes(4 * size))
+        self._index = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        """Return the number of samples held."""
+        return self._count
+
+    def clear(self) -> None:
+        """Drop all samples, keeping the storage for reuse."""
+        self._index = 0
+        self._count = 0
+
+    def append(self, value: float) -> None:
+        """Add a sample, replacing the oldest once full."""
+        self._values[self._index] = value
+        self._index = (self._index + 1) % len(self._values)
+        self._count = min(self._count + 1, len(self._values))
+
+    def _samples(self) -> array:
+        """Return the samples held."""
+        if self._count == len(self._values):
+            return self._values
+        return self._values[: self._count]
+
+    @property
+    def latest(self) -> float | None:
+        """Return the newest sample."""
+        if not self._count:
+            return None
+        return self._values[self._index - 1]
+
+    @property
+    def minimum(self) -> float | None:
+        """Return the smallest sample."""
+        return min(self._samples()) if self._count else None
+
+    @property
+    def maximum(self) -> float | None:
+        """Return the largest sample."""
+        return max(self._samples()) if self._count else None
+
+    @property
+    def mean(self) -> float | None:
+        """Return the mean of the samples."""
+        return sum(self._samples()) / self._count if self._count else None
+
+
+class ClientMetrics:
+    """Rolling signal strength and link rate of one client."""
+
+    __slots__ = ("signal", "link_rate", "band")
+
+    def __init__(self, window: int) -> None:
+        """Initialize the metrics."""
+        self.signal = RingBuffer(window)
+        self.link_rate = RingBuffer(window)
+        self.band: str | None = None
+
+    def clear(self) -> None:
+        """Drop all samples."""
+        self.signal.clear()
+        self.link_rate.clear()
+        self.band = None
+
+
+class MetricsStore:
+    """Rolling metrics for the clients connected to a router.
+
+    At most `max_clients` are tracked so memory use has a hard cap of
+    `max_clients` times `window` samples per metric. Buffers of departed
+    clients are evicted and reused for new ones.
+    """
+
+    def __init__(self, window: int, max_clients: int) -> None:
+        """Initialize the store."""
+        self.window = window
+        self.max_clients = max_clients
+        self.clients: dict[str, ClientMetrics] = {}
+        self.updated: set[str] = set()
+        self._free: list[ClientMetrics] = []
+        self._capped = False
+
+    def update(self, connections: dict[str, dict[str, Any]]) -> None:
+        """Add a poll of network connections keyed by tracked MAC."""
+        for mac in self.clients.keys() - connections.keys():
+            self.evict(mac)
+
+        self.updated = set()
+        for mac, connection in connections.items():
+            if (metrics := self.clients.get(mac)) is None:
+                if len(self.clients) >= self.max_clients:
+                    if not self._capped:
+                        _LOGGER.info(
+                            "Tracking link metrics for at most %s clients",
+                            self.max_clients,
+                        )
+                        self._capped = True
+                    continue
+                metrics = self._free.pop() if self._free else ClientMetrics(self.window)
+                self.clients[mac] = metrics
+
+            if (rate := connection.get("negotiatedMbps")) is not None:
+                metrics.link_rate.append(rate)
+            if wireless := connection.get("wireless"):
+                if (signal := wireless.get("signalDecibels")) is not None:
+                    metrics.signal.append(signal)
+                metrics.band = wireless.get("band")
+            self.updated.add(mac)
+
+    def evict(self, mac: str) -> None:
+        """Drop the metrics of a client."""
+        if (metrics := self.clients.pop(mac, None)) is not None:
+            metrics.clear()
+            self._free.append(metrics)
+            self._capped = False
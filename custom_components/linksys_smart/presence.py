@@ -0,0 +1,101 @@
+"""Device presence engine."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable
+from datetime import datetime, timedelta
+
+
+class PresenceEngine:
+    """Work out which devices are home once per poll.
+
+    A device comes home after being seen in `hits` consecutive polls. It
+    leaves after being missed in `misses` consecutive polls and not being
+    seen for `detection_time`. Only devices that are home, connected or
+    part way to coming home are looked at each poll.
+    """
+
+    def __init__(
+        self, detection_time: timedelta, hits: int = 1, misses: int = 1
+    ) -> None:
+        """Initialize the presence engine."""
+        self.detection_time = detection_time
+        self.hits = max(hits, 1)
+        self.misses = max(misses, 1)
+        self.home: set[str] = set()
+        self._hit_counts: dict[str, int] = {}
+        self._miss_counts: dict[str, int] = {}
+
+    def restore(self, mac: str, last_seen: datetime | None, now: datetime) -> None:
+        """Restore a device as home if it was seen within the detection time."""
+        if last_seen and now - last_seen < self.detection_time:
+            self.home.add(mac)
+
+    def discard(self, mac: str) -> None:
+        """Forget a device."""
+        self.home.discard(mac)
+        self._hit_counts.pop(mac, None)
+        self._miss_counts.pop(mac, None)
+
+    def update(
+        self,
+        connected: set[str],
+        last_seen: Callable[[str], datetime | None],
+        now: datetime,
+    ) -> set[str]:
+        """Apply one poll of connected devices, returning those that changed."""
+        changed: set[str] = set()
+
+        for mac in connected:
+            self._miss_counts.pop(mac, None)
+            if mac in self.home:
+                continue
+            hits = self._hit_counts.get(mac, 0) + 1
+            if hits >= self.hits:
+                self._hit_counts.pop(mac, None)
+                self.home.add(mac)
+                changed.add(mac)
+            else:
+                self._hit_counts[mac] = hits
+
+        # Devices part way to coming home have to be seen in a row
+        for mac in self._hit_counts.keys() - connected:
+            del self._hit_counts[mac]
+
+        for mac in self.home - connected:
+            self._miss_counts[mac] = self._miss_counts.get(mac, 0) + 1
+
+        changed.update(self.expire(last_seen, now))
+        return changed
+
+    def expire(
+        self, last_seen: Callable[[str], datetime | None], now: datetime
+    ) -> set[str]:
+        """Mark devices away that have been missed for long enough."""
+        expired = {
+            mac
+            for mac in self._expiring()
+            if (seen := last_seen(mac)) is None or now - seen >= self.detection_time
+        }
+        for mac in expired:
+            self.home.discard(mac)
+            self._miss_counts.pop(mac, None)
+        return expired
+
+    def next_expiry(
+        self, last_seen: Callable[[str], datetime | None]
+    ) -> datetime | None:
+        """Return when the next device will leave if it is not seen again."""
+        return min(
+            (
+                seen + self.detection_time
+                for mac in self._expiring()
+                if (seen := last_seen(mac)) is not None
+            ),
+            default=None,
+        )
+
+    def _expiring(self) -> Iterable[str]:
+        """Return home devices that have been missed enough polls to leave."""
+        return [
+            mac for mac, misses in self._miss_counts.items() if misses >= self.misses
+        ]
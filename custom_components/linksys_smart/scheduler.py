@@ -0,0 +1,132 @@
+"""Polling scheduler shared by all Linksys routers."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+import heapq
+import itertools
+import time
+from typing import Any
+
+from .const import FLEET_MAX_CONCURRENT, FLEET_STAGGER
+
+
+class EntrySchedule:
+    """Scheduling state of one config entry."""
+
+    __slots__ = ("last_success", "last_start", "lag", "wait")
+
+    def __init__(self) -> None:
+        """Initialize the schedule."""
+        self.last_success: float | None = None
+        self.last_start: float | None = None
+        self.lag: float = 0.0
+        self.wait: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the schedule as a dictionary."""
+        now = time.monotonic()
+        return {
+            "seconds_since_success": (
+                now - self.last_success if self.last_success is not None else None
+            ),
+            "lag": self.lag,
+            "wait": self.wait,
+        }
+
+
+class FleetScheduler:
+    """Share polling between the routers of all config entries.
+
+    Poll starts are spaced at least `stagger` seconds apart, at most
+    `max_concurrent` polls run at once, and when polls have to wait the
+    entry whose data is stalest goes first.
+    """
+
+    def __init__(
+        self, max_concurrent: int = FLEET_MAX_CONCURRENT, stagger: float = FLEET_STAGGER
+    ) -> None:
+        """Initialize the scheduler."""
+        self.max_concurrent = max_concurrent
+        self.stagger = stagger
+        self.entries: dict[str, EntrySchedule] = {}
+        self._active = 0
+        self._waiters: list[tuple[float, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._next_start = 0.0
+
+    def register(self, entry_id: str) -> None:
+        """Add a config entry."""
+        self.entries.setdefault(entry_id, EntrySchedule())
+
+    def unregister(self, entry_id: str) -> None:
+        """Remove a config entry."""
+        self.entries.pop(entry_id, None)
+
+    @asynccontextmanager
+    async def slot(self, entry_id: str, due: float | None = None) -> AsyncIterator[None]:
+        """Wait for a turn to poll the router of a config entry.
+
+        `due` is the monotonic time the poll was scheduled for, used to
+        report how late it started.
+        """
+        schedule = self.entries.setdefault(entry_id, EntrySchedule())
+        requested = time.monotonic()
+
+        # Reserve a start time spaced from the previous poll
+        start = max(requested, self._next_start)
+        self._next_start = start + self.stagger
+        if start > requested:
+            await asyncio.sleep(start - requested)
+
+        priority = schedule.last_success if schedule.last_success is not None else 0.0
+        await self._acquire(priority)
+
+        now = time.monotonic()
+        schedule.wait = now - requested
+        schedule.lag = max(now - due, 0.0) if due is not None else schedule.wait
+        schedule.last_start = now
+        try:
+            yield
+            schedule.last_success = time.monotonic()
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: float) -> None:
+        """Take a polling slot, queueing by priority when all are taken."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # The slot was handed over just before cancelling
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        """Hand a polling slot to the stalest waiter, or free it."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the scheduler state as a dictionary."""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "stagger": self.stagger,
+            "active": self._active,
+            "waiting": sum(1 for *_, future in self._waiters if not future.done()),
+            "entries": {
+                entry_id: schedule.as_dict()
+                for entry_id, schedule in self.entries.items()
+            },
+        }
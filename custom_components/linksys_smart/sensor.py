@@ -0,0 +1,373 @@
+"""Linksys Smart Wifi sensors."""
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+from homeassistant.components.sensor import (
+    DOMAIN as SENSOR,
+    SensorDeviceClass,
+    SensorEntity,
+    SensorEntityDescription,
+    SensorStateClass,
+)
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import (
+    SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+    EntityCategory,
+    UnitOfDataRate,
+    UnitOfInformation,
+    UnitOfTime,
+)
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
+from homeassistant.helpers.device_registry import CONNECTION_NETWORK_MAC
+from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.typing import StateType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+from .const import CONF_REMOVE_EVICTED, DEFAULT_REMOVE_EVICTED, DOMAIN
+from .controller import CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+from .hub import LinksysDataUpdateCoordinator
+from .metrics import ClientMetrics, RingBuffer
+from .topology import MeshNode
+
+
+def _mean_latency(coordinator: LinksysDataUpdateCoordinator) -> float | None:
+    """Return the mean latency of all requests to the router."""
+    requests = coordinator.request_stats.requests.values()
+    if not (count := sum(stats.count for stats in requests)):
+        return None
+    return round(sum(stats.latency_total for stats in requests) / count, 3)
+
+
+@dataclass
+class LinksysSensorEntityDescriptionMixin:
+    """Mixin for required keys."""
+
+    value_fn: Callable[[LinksysDataUpdateCoordinator], StateType]
+
+
+@dataclass
+class LinksysSensorEntityDescription(
+    SensorEntityDescription, LinksysSensorEntityDescriptionMixin
+):
+    """Describes a Linksys sensor entity."""
+
+
+DIAGNOSTIC_SENSORS: tuple[LinksysSensorEntityDescription, ...] = (
+    LinksysSensorEntityDescription(
+        key="polling_interval",
+        name="Polling interval",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        value_fn=lambda coordinator: coordinator.current_interval,
+    ),
+    LinksysSensorEntityDescription(
+        key="poll_duration",
+        name="Poll duration",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.api.cycle_stats.last.get("total"),
+    ),
+    LinksysSensorEntityDescription(
+        key="loop_blocking",
+        name="Event loop blocking",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: (
+            round(blocking, 4)
+            if (blocking := coordinator.api.cycle_stats.last.get("blocking")) is not None
+            else None
+        ),
+    ),
+    LinksysSensorEntityDescription(
+        key="request_latency",
+        name="Mean request latency",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=_mean_latency,
+    ),
+    LinksysSensorEntityDescription(
+        key="response_size",
+        name="Response size",
+        device_class=SensorDeviceClass.DATA_SIZE,
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: coordinator.api.api.last_decode.get("bytes"),
+    ),
+    LinksysSensorEntityDescription(
+        key="schedule_lag",
+        name="Poll schedule lag",
+        device_class=SensorDeviceClass.DURATION,
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        state_class=SensorStateClass.MEASUREMENT,
+        value_fn=lambda coordinator: (
+            round(lag, 3) if (lag := coordinator.schedule_lag) is not None else None
+        ),
+    ),
+    LinksysSensorEntityDescription(
+        key="request_errors",
+        name="Request errors",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value_fn=lambda coordinator: coordinator.request_stats.error_count,
+    ),
+    LinksysSensorEntityDescription(
+        key="circuit_state",
+        name="Circuit state",
+        device_class=SensorDeviceClass.ENUM,
+        options=[CIRCUIT_CLOSED, CIRCUIT_OPEN, CIRCUIT_HALF_OPEN],
+        value_fn=lambda coordinator: coordinator.circuit_state,
+    ),
+)
+
+
+@dataclass
+class LinksysClientSensorEntityDescriptionMixin:
+    """Mixin for required keys."""
+
+    buffer_fn: Callable[[ClientMetrics], RingBuffer]
+
+
+@dataclass
+class LinksysClientSensorEntityDescription(
+    SensorEntityDescription, LinksysClientSensorEntityDescriptionMixin
+):
+    """Describes a Linksys client link metric sensor entity."""
+
+
+CLIENT_SENSORS: tuple[LinksysClientSensorEntityDescription, ...] = (
+    LinksysClientSensorEntityDescription(
+        key="signal",
+        name="Signal strength",
+        device_class=SensorDeviceClass.SIGNAL_STRENGTH,
+        native_unit_of_measurement=SIGNAL_STRENGTH_DECIBELS_MILLIWATT,
+        state_class=SensorStateClass.MEASUREMENT,
+        buffer_fn=lambda metrics: metrics.signal,
+    ),
+    LinksysClientSensorEntityDescription(
+        key="link_rate",
+        name="Link rate",
+        device_class=SensorDeviceClass.DATA_RATE,
+        native_unit_of_measurement=UnitOfDataRate.MEGABITS_PER_SECOND,
+        state_class=SensorStateClass.MEASUREMENT,
+        buffer_fn=lambda metrics: metrics.link_rate,
+    ),
+)
+
+# Keys of the per device sensors removed along with evicted devices
+EVICTED_SENSOR_KEYS: tuple[str, ...] = (
+    *(description.key for description in CLIENT_SENSORS),
+    "clients",
+)
+
+
+async def async_setup_entry(
+    hass: HomeAssistant,
+    config_entry: ConfigEntry,
+    async_add_entities: AddEntitiesCallback,
+) -> None:
+    """Set up sensors for Linksys component."""
+    coordinator: LinksysDataUpdateCoordinator = hass.data[DOMAIN][
+        config_entry.entry_id
+    ]
+
+    async_add_entities(
+        LinksysDiagnosticSensor(coordinator, description)
+        for description in DIAGNOSTIC_SENSORS
+    )
+
+    tracked: set[str] = set()
+    tracked_nodes: set[str] = set()
+
+    registry = er.async_get(hass)
+    remove_evicted = config_entry.options.get(
+        CONF_REMOVE_EVICTED, DEFAULT_REMOVE_EVICTED
+    )
+
+    @callback
+    def update_hub() -> None:
+        """Add sensors for clients with new link metrics and new mesh nodes."""
+        if remove_evicted:
+            for mac in coordinator.api.evicted:
+                for key in EVICTED_SENSOR_KEYS:
+                    entity_id = registry.async_get_entity_id(
+                        SENSOR, DOMAIN, f"{mac}_{key}"
+                    )
+                    if entity_id is not None:
+                        registry.async_remove(entity_id)
+                # Sensors are created again should the device come back
+                tracked.discard(mac)
+                tracked_nodes.discard(mac)
+
+        new_sensors: list[SensorEntity] = []
+        for mac in coordinator.api.metrics.clients.keys() - tracked:
+            tracked.add(mac)
+            new_sensors.extend(
+                LinksysClientSensor(coordinator, mac, description)
+                for description in CLIENT_SENSORS
+            )
+        for mac in coordinator.api.topology.nodes.keys() - tracked_nodes:
+            tracked_nodes.add(mac)
+            new_sensors.append(LinksysNodeSensor(coordinator, mac))
+        if new_sensors:
+            async_add_entities(new_sensors)
+
+    config_entry.async_on_unload(coordinator.async_add_listener(update_hub))
+
+    update_hub()
+
+
+class LinksysDiagnosticSensor(
+    CoordinatorEntity[LinksysDataUpdateCoordinator], SensorEntity
+):
+    """Representation of a router diagnostic sensor."""
+
+    entity_description: LinksysSensorEntityDescription
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_entity_registry_enabled_default = False
+    _attr_has_entity_name = True
+
+    def __init__(
+        self,
+        coordinator: LinksysDataUpdateCoordinator,
+        description: LinksysSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._attr_unique_id = f"{coordinator.serial_num}_{description.key}"
+        self._attr_device_info = DeviceInfo(
+            connections={(DOMAIN, coordinator.serial_num)},
+        )
+
+    @property
+    def available(self) -> bool:
+        """Diagnostics stay available while the router is failing."""
+        return True
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the state of the sensor."""
+        return self.entity_description.value_fn(self.coordinator)
+
+
+class LinksysClientSensor(
+    CoordinatorEntity[LinksysDataUpdateCoordinator], SensorEntity
+):
+    """Rolling link metric of a network client."""
+
+    entity_description: LinksysClientSensorEntityDescription
+    _attr_entity_registry_enabled_default = False
+
+    def __init__(
+        self,
+        coordinator: LinksysDataUpdateCoordinator,
+        mac: str,
+        description: LinksysClientSensorEntityDescription,
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self.entity_description = description
+        self._mac = mac
+        self._connected = True
+        device = coordinator.api.devices.get(mac)
+        self._attr_name = f"{device.name if device else mac} {description.name}"
+        self._attr_unique_id = f"{mac}_{description.key}"
+
+    @property
+    def _buffer(self) -> RingBuffer | None:
+        """Return the samples of this metric, if the client is connected."""
+        if (metrics := self.coordinator.api.metrics.clients.get(self._mac)) is None:
+            return None
+        return self.entity_description.buffer_fn(metrics)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Only write state when this client has new samples or leaves."""
+        if self._mac in self.coordinator.api.metrics.updated:
+            self._connected = True
+        elif self._connected:
+            self._connected = False
+        else:
+            return
+        self.async_write_ha_state()
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the rolling mean."""
+        if (buffer := self._buffer) is None or (mean := buffer.mean) is None:
+            return None
+        return round(mean, 1)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the rolling minimum, maximum and latest sample."""
+        if (buffer := self._buffer) is None or not len(buffer):
+            return None
+        metrics = self.coordinator.api.metrics.clients[self._mac]
+        return {
+            "min": buffer.minimum,
+            "max": buffer.maximum,
+            "latest": buffer.latest,
+            "samples": len(buffer),
+            "band": metrics.band,
+        }
+
+
+class LinksysNodeSensor(
+    CoordinatorEntity[LinksysDataUpdateCoordinator], SensorEntity
+):
+    """Number of clients connected through a mesh node."""
+
+    _attr_has_entity_name = True
+    _attr_name = "Connected clients"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, coordinator: LinksysDataUpdateCoordinator, mac: str) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._mac = mac
+        self._attr_unique_id = f"{mac}_clients"
+        node = coordinator.api.topology.nodes[mac]
+        if node.authority:
+            # The main router already has a device in the registry
+            self._attr_device_info = DeviceInfo(
+                connections={(DOMAIN, coordinator.serial_num)},
+            )
+        else:
+            self._attr_device_info = DeviceInfo(
+                connections={(CONNECTION_NETWORK_MAC, mac)},
+                manufacturer=coordinator.manufacturer,
+                name=node.name,
+            )
+
+    @property
+    def _node(self) -> MeshNode | None:
+        """Return the mesh node."""
+        return self.coordinator.api.topology.nodes.get(self._mac)
+
+    @property
+    def available(self) -> bool:
+        """Return whether the node is still part of the mesh."""
+        return super().available and self._node is not None
+
+    @property
+    def native_value(self) -> StateType:
+        """Return the number of connected clients of the node."""
+        if (node := self._node) is None:
+            return None
+        topology = self.coordinator.api.topology
+        return len(topology.clients(node) & self.coordinator.api.connected)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return the health and backhaul of the node."""
+        if (node := self._node) is None:
+            return None
+        return node.as_dict()
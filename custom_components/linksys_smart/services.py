@@ -0,0 +1,117 @@
+"""Linksys Smart Wifi device management services."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+
+import voluptuous as vol
+
+from homeassistant.const import ATTR_ENTITY_ID, ATTR_NAME
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, entity_registry as er
+
+from .const import DOMAIN
+from .controller import LinksysError
+from .device import Device
+from .hub import LinksysDataUpdateCoordinator
+
+SERVICE_SET_DEVICE_NAME = "set_device_name"
+SERVICE_BLOCK_DEVICE = "block_device"
+SERVICE_UNBLOCK_DEVICE = "unblock_device"
+
+SERVICES = (SERVICE_SET_DEVICE_NAME, SERVICE_BLOCK_DEVICE, SERVICE_UNBLOCK_DEVICE)
+
+DEVICE_SCHEMA = vol.Schema({vol.Required(ATTR_ENTITY_ID): cv.entity_ids})
+SET_DEVICE_NAME_SCHEMA = DEVICE_SCHEMA.extend({vol.Required(ATTR_NAME): cv.string})
+
+
+def _resolve_devices(
+    hass: HomeAssistant, call: ServiceCall
+) -> list[tuple[LinksysDataUpdateCoordinator, Device]]:
+    """Return the hub and device of each targeted tracker entity."""
+    registry = er.async_get(hass)
+    targets = []
+    for entity_id in call.data[ATTR_ENTITY_ID]:
+        if (
+            (entry := registry.async_get(entity_id)) is None
+            or entry.platform != DOMAIN
+            or (coordinator := hass.data[DOMAIN].get(entry.config_entry_id)) is None
+            or (device := coordinator.api.devices.get(entry.unique_id)) is None
+        ):
+            raise HomeAssistantError(f"{entity_id} is not a Linksys tracked device")
+        targets.append((coordinator, device))
+    return targets
+
+
+async def _async_apply(
+    hass: HomeAssistant,
+    call: ServiceCall,
+    write: Callable[[LinksysDataUpdateCoordinator, Device], Awaitable[None]],
+) -> None:
+    """Send a write for every targeted device at once so they are batched."""
+    try:
+        await asyncio.gather(
+            *(write(coordinator, device) for coordinator, device in _resolve_devices(hass, call))
+        )
+    except LinksysError as err:
+        raise HomeAssistantError(f"Error writing to router: {err}") from err
+
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the Linksys services."""
+    if hass.services.has_service(DOMAIN, SERVICE_SET_DEVICE_NAME):
+        return
+
+    async def async_set_device_name(call: ServiceCall) -> None:
+        """Rename devices on the router."""
+        # Devices are renamed by router device ID, which is checked for every
+        # device before any is renamed
+        for _, device in _resolve_devices(hass, call):
+            if device.device_id is None:
+                raise HomeAssistantError(
+                    f"{device.name or device.mac} has no router device ID to rename"
+                )
+        await _async_apply(
+            hass,
+            call,
+            lambda coordinator, device: coordinator.api.api.async_set_device_name(
+                device.device_id, call.data[ATTR_NAME]
+            ),
+        )
+
+    async def async_block_device(call: ServiceCall) -> None:
+        """Block internet access of devices."""
+        await _async_apply(
+            hass,
+            call,
+            lambda coordinator, device: coordinator.api.api.async_set_device_blocked(
+                device.mac, True
+            ),
+        )
+
+    async def async_unblock_device(call: ServiceCall) -> None:
+        """Unblock internet access of devices."""
+        await _async_apply(
+            hass,
+            call,
+            lambda coordinator, device: coordinator.api.api.async_set_device_blocked(
+                device.mac, False
+            ),
+        )
+
+    hass.services.async_register(
+        DOMAIN, SERVICE_SET_DEVICE_NAME, async_set_device_name, SET_DEVICE_NAME_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_BLOCK_DEVICE, async_block_device, DEVICE_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_UNBLOCK_DEVICE, async_unblock_device, DEVICE_SCHEMA
+    )
+
+
+def async_unload_services(hass: HomeAssistant) -> None:
+    """Remove the Linksys services."""
+    for service in SERVICES:
+        hass.services.async_remove(DOMAIN, service)
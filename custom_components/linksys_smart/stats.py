@@ -0,0 +1,153 @@
+"""Request and poll cycle instrumentation."""
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any
+
+# Upper bounds in seconds of the latency histogram buckets. The last bucket
+# counts everything slower.
+LATENCY_BUCKETS: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestStats:
+    """Counters for one kind of request to the router."""
+
+    __slots__ = (
+        "count",
+        "errors",
+        "histogram",
+        "latency_total",
+        "latency_max",
+        "last_latency",
+        "bytes_total",
+        "last_bytes",
+        "decode_total",
+    )
+
+    def __init__(self) -> None:
+        """Initialize the counters."""
+        self.count = 0
+        self.errors: dict[str, int] = {}
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_total = 0.0
+        self.latency_max = 0.0
+        self.last_latency = 0.0
+        self.bytes_total = 0
+        self.last_bytes = 0
+        self.decode_total = 0.0
+
+    def record(
+        self,
+        latency: float,
+        size: int = 0,
+        decode_time: float = 0.0,
+        error: str | None = None,
+    ) -> None:
+        """Record a single request."""
+        self.count += 1
+        self.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+        self.latency_total += latency
+        self.latency_max = max(self.latency_max, latency)
+        self.last_latency = latency
+        self.bytes_total += size
+        self.last_bytes = size
+        self.decode_total += decode_time
+        if error:
+            self.record_error(error)
+
+    def record_error(self, error: str) -> None:
+        """Count an error of this kind of request."""
+        self.errors[error] = self.errors.get(error, 0) + 1
+
+    @property
+    def latency_mean(self) -> float:
+        """Return the mean request latency in seconds."""
+        return self.latency_total / self.count if self.count else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the counters as a dictionary."""
+        return {
+            "count": self.count,
+            "errors": dict(self.errors),
+            "latency_histogram": {
+                **{
+                    f"le_{bound}": count
+                    for bound, count in zip(LATENCY_BUCKETS, self.histogram)
+                },
+                "inf": self.histogram[-1],
+            },
+            "latency_mean": self.latency_mean,
+            "latency_max": self.latency_max,
+            "last_latency": self.last_latency,
+            "bytes_total": self.bytes_total,
+            "last_bytes": self.last_bytes,
+            "decode_time_total": self.decode_total,
+        }
+
+
+class Instrumentation:
+    """Request statistics keyed by the actions sent in each transaction."""
+
+    def __init__(self) -> None:
+        """Initialize the statistics."""
+        self.requests: dict[str, RequestStats] = {}
+
+    @staticmethod
+    def label(actions: list[str]) -> str:
+        """Return the key used for a transaction of the given actions."""
+        return "+".join(actions)
+
+    def record(self, actions: list[str], *args: Any, **kwargs: Any) -> None:
+        """Record a request made for the given actions."""
+        key = self.label(actions)
+        if (stats := self.requests.get(key)) is None:
+            stats = self.requests[key] = RequestStats()
+        stats.record(*args, **kwargs)
+
+    def record_error(self, actions: list[str], error: str) -> None:
+        """Record a request for the given actions refused before being sent."""
+        key = self.label(actions)
+        if (stats := self.requests.get(key)) is None:
+            stats = self.requests[key] = RequestStats()
+        stats.record_error(error)
+
+    @property
+    def error_count(self) -> int:
+        """Return the total number of failed requests."""
+        return sum(
+            sum(stats.errors.values()) for stats in self.requests.values()
+        )
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return all statistics as a dictionary."""
+        return {key: stats.as_dict() for key, stats in self.requests.items()}
+
+
+class CycleStats:
+    """Timings of the phases of hub update cycles."""
+
+    def __init__(self) -> None:
+        """Initialize the timings."""
+        self.count = 0
+        self.last: dict[str, float] = {}
+        self.total: dict[str, float] = {}
+        self.max: dict[str, float] = {}
+
+    def record(self, **phases: float) -> None:
+        """Record the phase durations of one cycle in seconds."""
+        self.count += 1
+        self.last = phases
+        for phase, duration in phases.items():
+            self.total[phase] = self.total.get(phase, 0.0) + duration
+            self.max[phase] = max(self.max.get(phase, 0.0), duration)
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the timings as a dictionary."""
+        return {
+            "count": self.count,
+            "last": dict(self.last),
+            "mean": {
+                phase: total / self.count for phase, total in self.total.items()
+            },
+            "max": dict(self.max),
+        }
@@ -0,0 +1,120 @@
+"""Mesh node topology."""
+from __future__ import annotations
+
+from collections.abc import Iterable
+from typing import Any
+
+from .device import ATTR_SLUGS, Device
+from .index import DeviceIndex
+
+
+class MeshNode:
+    """A router or satellite node of a mesh network."""
+
+    __slots__ = ("device", "backhaul", "info", "reachable", "latency")
+
+    def __init__(self, device: Device) -> None:
+        """Initialize the node."""
+        self.device = device
+        self.backhaul: dict[str, Any] | None = None
+        self.info: dict[str, Any] | None = None
+        self.reachable: bool | None = None
+        self.latency: float | None = None
+
+    @property
+    def mac(self) -> str | None:
+        """Return the MAC address of the node."""
+        return self.device.mac
+
+    @property
+    def name(self) -> str | None:
+        """Return the name of the node."""
+        return self.device.name
+
+    @property
+    def authority(self) -> bool:
+        """Return whether this is the main router of the mesh."""
+        return bool(self.device.attrs.get(ATTR_SLUGS["isAuthority"]))
+
+    @property
+    def node_type(self) -> str | None:
+        """Return the node type reported by the router."""
+        return self.device.attrs.get(ATTR_SLUGS["nodeType"])
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the node health as a dictionary."""
+        backhaul = self.backhaul or {}
+        wireless = backhaul.get("wirelessConnectionInfo") or {}
+        info = self.info or {}
+        return {
+            "node_type": self.node_type,
+            "authority": self.authority,
+            "model": info.get("modelNumber"),
+            "firmware": info.get("firmwareVersion"),
+            "reachable": self.reachable,
+            "latency": round(self.latency, 3) if self.latency is not None else None,
+            "backhaul_type": backhaul.get("connectionType"),
+            "backhaul_speed": backhaul.get("speedMbps"),
+            "backhaul_rssi": wireless.get("rssi"),
+            "parent_ip": backhaul.get("parentIPAddress"),
+        }
+
+
+class MeshTopology:
+    """The nodes of a mesh network and the clients attached to each.
+
+    Nodes are the devices the router reports a node type or authority for.
+    Clients are attached to the node given as parent in their connections,
+    which the device index already maps.
+    """
+
+    def __init__(self, index: DeviceIndex) -> None:
+        """Initialize the topology."""
+        self.index = index
+        self.nodes: dict[str, MeshNode] = {}
+
+    @staticmethod
+    def is_node(device: Device) -> bool:
+        """Return whether a device is a mesh node."""
+        attrs = device.attrs
+        return bool(
+            attrs.get(ATTR_SLUGS["nodeType"]) or attrs.get(ATTR_SLUGS["isAuthority"])
+        )
+
+    def update(self, macs: Iterable[str], devices: dict[str, Device]) -> bool:
+        """Add, refresh or remove the given devices as nodes.
+
+        Returns whether the set of nodes changed.
+        """
+        changed = False
+        for mac in macs:
+            device = devices.get(mac)
+            if device is not None and self.is_node(device):
+                if (node := self.nodes.get(mac)) is None:
+                    self.nodes[mac] = MeshNode(device)
+                    changed = True
+                else:
+                    node.device = device
+            elif self.nodes.pop(mac, None) is not None:
+                changed = True
+        return changed
+
+    @property
+    def satellites(self) -> list[MeshNode]:
+        """Return the nodes other than the main router."""
+        return [node for node in self.nodes.values() if not node.authority]
+
+    def clients(self, node: MeshNode) -> set[str]:
+        """Return the MAC addresses of the devices attached to a node."""
+        if not (device_id := node.device.device_id):
+            return set()
+        return self.index.children(device_id)
+
+    def node_of(self, device: Device) -> MeshNode | None:
+        """Return the node a device is attached to."""
+        for connection in device.attrs.get(ATTR_SLUGS["connections"], []):
+            if (parent := connection.get("parentDeviceID")) and (
+                mac := self.index.lookup_device_id(parent)
+            ) in self.nodes:
+                return self.nodes[mac]
+        return None
@@ -0,0 +1,176 @@
+"""End-to-end performance benchmark for the linksys_smart hub.
+
+Starts the JNAP emulator in a separate process and drives LinksysData
+against it, reporting poll latency, CPU time and event loop blocking per
+cycle, peak memory and the number of tracker state writes per cycle:
+
+    python tools/benchmark.py --clients 10 1000 10000 --cycles 20
+
+Requires Home Assistant and aiohttp to be installed.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections.abc import Callable
+import json
+from pathlib import Path
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from types import MappingProxyType, SimpleNamespace
+
+from aiohttp import ClientSession
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from custom_components.linksys_smart.controller import LinksysController  # noqa: E402
+from custom_components.linksys_smart.hub import LinksysData  # noqa: E402
+
+
+class MemoryStore:
+    """Snapshot store kept in memory, as a Store needs a running Home Assistant."""
+
+    def __init__(self) -> None:
+        """Initialize the store."""
+        self.data: dict | None = None
+
+    async def async_load(self) -> dict | None:
+        """Return the saved data."""
+        return self.data
+
+    async def async_save(self, data: dict) -> None:
+        """Save data."""
+        self.data = data
+
+    def async_delay_save(self, data_func: Callable[[], dict], delay: float = 0) -> None:
+        """Save data at once, as nothing is measured across the delay."""
+        self.data = data_func()
+
+
+def _free_port() -> int:
+    """Return a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_port(port: int, timeout: float = 10.0) -> None:
+    """Wait until the emulator accepts connections."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+            continue
+        writer.close()
+        return
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Return the given percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent))]
+
+
+async def run_scenario(args: argparse.Namespace, clients: int) -> dict[str, float]:
+    """Benchmark polling a router with the given number of clients."""
+    port = _free_port()
+    emulator = subprocess.Popen(
+        [
+            sys.executable,
+            str(ROOT / "tools" / "jnap_emulator.py"),
+            "--port", str(port),
+            "--devices", str(clients),
+            "--churn", str(args.churn),
+            "--latency", str(args.latency),
+            "--seed", "1",
+        ],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await _wait_for_port(port)
+        async with ClientSession() as session:
+            config = MappingProxyType(
+                {"host": f"127.0.0.1:{port}", "username": "admin", "password": "admin"}
+            )
+            api = LinksysController(session, config)
+            await api.async_initialize()
+            # Pick the action versions the way the coordinator does
+            info = await api.async_get_device_info()
+            await api.async_discover_capabilities(info.get("services"))
+            config_entry = SimpleNamespace(data=dict(config), options={}, entry_id="bench")
+            loop = asyncio.get_running_loop()
+            hass = SimpleNamespace(
+                loop=loop,
+                async_add_executor_job=lambda target, *args: loop.run_in_executor(
+                    None, target, *args
+                ),
+            )
+            data = LinksysData(hass, config_entry, api, store=MemoryStore())
+
+            tracemalloc.start()
+            latencies: list[float] = []
+            cpu: list[float] = []
+            writes: list[int] = []
+            blocking: list[float] = []
+            for _ in range(args.cycles + 1):
+                start, start_cpu = time.perf_counter(), time.process_time()
+                await data.async_update_devices()
+                latencies.append(time.perf_counter() - start)
+                cpu.append(time.process_time() - start_cpu)
+                writes.append(len(data.changed))
+                blocking.append(data.cycle_stats.last["blocking"])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+    finally:
+        emulator.terminate()
+        emulator.wait()
+
+    # The first cycle is the full sync, the rest are steady state
+    return {
+        "clients": clients,
+        "first_sync_ms": latencies[0] * 1000,
+        "poll_p50_ms": statistics.median(latencies[1:]) * 1000,
+        "poll_p95_ms": _percentile(latencies[1:], 0.95) * 1000,
+        "cpu_per_cycle_ms": statistics.mean(cpu[1:]) * 1000,
+        "loop_blocking_first_ms": blocking[0] * 1000,
+        "loop_blocking_p95_ms": _percentile(blocking[1:], 0.95) * 1000,
+        "peak_memory_kib": peak / 1024,
+        "state_writes_first": writes[0],
+        "state_writes_per_cycle": statistics.mean(writes[1:]),
+    }
+
+
+async def main() -> None:
+    """Run the benchmark scenarios."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--churn", type=float, default=0.01)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = [await run_scenario(args, clients) for clients in args.clients]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    columns = list(results[0])
+    print(" ".join(f"{column:>22}" for column in columns))
+    for result in results:
+        print(" ".join(f"{result[column]:>22.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,218 @@
+"""Standalone JNAP client for profiling routers.
+
+Polls a router, or the JNAP emulator, through the integration's controller
+without Home Assistant, then reports per-action timings:
+
+    python tools/jnap_cli.py --host 192.168.1.1 --password secret \\
+        --rate 2 --concurrency 2 --duration 60 --capture capture.jsonl
+
+Captured responses can be served again with
+`python tools/jnap_emulator.py --replay capture.jsonl`. The controller is
+loaded without the integration's package, so only aiohttp is required and
+its import time is reported on its own.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib
+import json
+from pathlib import Path
+import statistics
+import sys
+import time
+from types import MappingProxyType, ModuleType
+from typing import IO, Any
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPONENT = ROOT / "custom_components" / "linksys_smart"
+# Name the component directory is imported under, so that importing the
+# controller does not run the integration's __init__ and its Home Assistant
+# imports
+PACKAGE = "linksys_smart_client"
+
+DEFAULT_ACTIONS = [
+    "devicelist/GetDevices3",
+    "networkconnections/GetNetworkConnections",
+]
+
+
+def load_controller() -> ModuleType:
+    """Import the controller module without Home Assistant."""
+    if PACKAGE not in sys.modules:
+        package = ModuleType(PACKAGE)
+        package.__path__ = [str(COMPONENT)]
+        sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.controller")
+
+
+def _percentile(values: list[float], percent: float) -> float:
+    """Return the given percentile of a list of values."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent))]
+
+
+class Poller:
+    """Send transactions to a router at a fixed rate."""
+
+    def __init__(
+        self,
+        api: Any,
+        transactions: list[list[tuple[str, dict[str, Any]]]],
+        rate: float,
+        count: int,
+        capture: IO[str] | None = None,
+    ) -> None:
+        """Initialize the poller."""
+        self.api = api
+        self.error = sys.modules[f"{PACKAGE}.controller"].LinksysError
+        self.transactions = transactions
+        self.interval = 1 / rate if rate > 0 else 0.0
+        self.remaining = count
+        self.capture = capture
+        self.latencies: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self._next_start = 0.0
+
+    async def _wait_turn(self) -> None:
+        """Wait until the next request may start."""
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        self._next_start = start + self.interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def _send(self, actions: list[tuple[str, dict[str, Any]]]) -> None:
+        """Send one transaction, recording its latency and response."""
+        label = self.api.stats.label([action for action, _ in actions])
+        start = time.perf_counter()
+        try:
+            responses = await self.api.request_batch(actions, coalesce=False)
+        except self.error as err:
+            self.errors[err.code] = self.errors.get(err.code, 0) + 1
+            return
+        latency = time.perf_counter() - start
+        self.latencies.setdefault(label, []).append(latency)
+        if self.capture is not None:
+            self.capture.write(
+                json.dumps(
+                    {"actions": actions, "latency": latency, "responses": responses}
+                )
+                + "\n"
+            )
+
+    async def worker(self, deadline: float) -> None:
+        """Send transactions in turn until the deadline or request count is hit."""
+        index = 0
+        while time.monotonic() < deadline and self.remaining > 0:
+            self.remaining -= 1
+            await self._wait_turn()
+            await self._send(self.transactions[index % len(self.transactions)])
+            index += 1
+
+    def summary(self) -> dict[str, Any]:
+        """Return the timings of each kind of transaction."""
+        stats = self.api.stats.as_dict()
+        return {
+            label: {
+                "count": len(latencies),
+                "p50_ms": statistics.median(latencies) * 1000,
+                "p95_ms": _percentile(latencies, 0.95) * 1000,
+                "max_ms": max(latencies) * 1000,
+                "bytes_mean": stats[label]["bytes_total"] / stats[label]["count"],
+                "decode_ms_total": stats[label]["decode_time_total"] * 1000,
+            }
+            for label, latencies in self.latencies.items()
+        }
+
+
+async def run(args: argparse.Namespace) -> dict[str, Any]:
+    """Poll the router and return the results."""
+    start = time.perf_counter()
+    controller = load_controller()
+    import_time = time.perf_counter() - start
+
+    config = MappingProxyType(
+        {
+            "host": args.host,
+            "username": args.username,
+            "password": args.password,
+            "max_inflight": args.concurrency,
+            "timeout": args.timeout,
+        }
+    )
+    api = controller.LinksysController(None, config)
+    await api.async_initialize()
+
+    actions = [(action, {}) for action in args.action or DEFAULT_ACTIONS]
+    transactions = [[action] for action in actions] if args.split else [actions]
+
+    capture = open(args.capture, "w", encoding="utf-8") if args.capture else None
+    poller = Poller(api, transactions, args.rate, args.count, capture)
+    deadline = time.monotonic() + args.duration
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(
+            *(poller.worker(deadline) for _ in range(args.concurrency))
+        )
+    finally:
+        elapsed = time.perf_counter() - started
+        await api.async_close()
+        if capture is not None:
+            capture.close()
+
+    return {
+        "import_ms": import_time * 1000,
+        "elapsed_s": elapsed,
+        "requests": sum(len(latencies) for latencies in poller.latencies.values()),
+        "errors": poller.errors,
+        "actions": poller.summary(),
+    }
+
+
+def main() -> None:
+    """Run the client from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1:8080")
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument(
+        "--action", action="append",
+        help="action to send, may be repeated (default: devices and connections)",
+    )
+    parser.add_argument(
+        "--split", action="store_true",
+        help="send each action in its own request instead of one transaction",
+    )
+    parser.add_argument(
+        "--rate", type=float, default=1.0,
+        help="requests started per second, 0 for as fast as possible",
+    )
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds")
+    parser.add_argument(
+        "--count", type=int, default=sys.maxsize, help="stop after this many requests"
+    )
+    parser.add_argument("--timeout", type=int, default=10, help="request timeout")
+    parser.add_argument("--capture", help="write responses to this JSON lines file")
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(
+        f"import {results['import_ms']:.1f} ms, {results['requests']} requests "
+        f"in {results['elapsed_s']:.1f} s, errors {results['errors'] or 'none'}"
+    )
+    columns = ["count", "p50_ms", "p95_ms", "max_ms", "bytes_mean", "decode_ms_total"]
+    print(f"{'action':<60}" + "".join(f"{column:>16}" for column in columns))
+    for label, timings in results["actions"].items():
+        print(f"{label:<60}" + "".join(f"{timings[column]:>16.1f}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
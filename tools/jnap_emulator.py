@@ -0,0 +1,410 @@
+"""Local JNAP router emulator.
+
+Serves the subset of the JNAP API used by the linksys_smart integration so
+it can be exercised and benchmarked without a physical router:
+
+    python tools/jnap_emulator.py --devices 1000 --churn 0.02 --latency 0.15
+
+Supports transactions, delta device lists via sinceRevision, mesh nodes,
+per-request latency, device churn and failure injection. Responses captured from a real
+router with tools/jnap_cli.py can be replayed in turn with --replay.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import random
+from typing import Any
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger(__name__)
+
+JNAP_ACTION_URL = "http://linksys.com/jnap/"
+JNAP_TRANSACTION = f"{JNAP_ACTION_URL}core/Transaction"
+
+# Actions that can be called without credentials on a real router
+UNAUTHENTICATED_ACTIONS = {"core/GetDeviceInfo"}
+
+# Services listed by core/GetDeviceInfo, providing the actions served here
+SERVICES = [
+    f"{JNAP_ACTION_URL}{service}"
+    for service in (
+        "core/Core",
+        "devicelist/DeviceList7",
+        "networkconnections/NetworkConnections2",
+        "router/Router7",
+        "nodes/diagnostics/Diagnostics",
+    )
+]
+
+
+def _node_id(index: int) -> str:
+    """Return the device ID of a device index."""
+    return f"00000000-0000-0000-0000-{index:012x}"
+
+
+def _mac(index: int) -> str:
+    """Return a stable locally administered MAC address for a device index."""
+    value = 0x020000000000 + index
+    return ":".join(f"{(value >> shift) & 0xFF:02X}" for shift in range(40, -1, -8))
+
+
+class JNAPEmulator:
+    """In-memory JNAP router."""
+
+    def __init__(
+        self,
+        devices: int = 10,
+        churn: float = 0.0,
+        latency: float = 0.0,
+        failure_rate: float = 0.0,
+        username: str = "admin",
+        password: str = "admin",
+        seed: int | None = None,
+        nodes: int = 1,
+    ) -> None:
+        """Initialize the emulator with a generated device list.
+
+        The first `nodes` devices are mesh nodes, with the other devices
+        attached to them in turn.
+        """
+        self.nodes = max(nodes, 1)
+        self.churn = churn
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.auth = "Basic " + base64.b64encode(
+            f"{username}:{password}".encode()
+        ).decode()
+        self.random = random.Random(seed)
+        self.revision = 1
+        self.devices: dict[str, dict[str, Any]] = {}
+        self.connected: set[str] = set()
+        self.deleted: dict[str, int] = {}
+        self.requests = 0
+        self.replay: dict[tuple[str, ...], list[list[dict[str, Any]]]] = {}
+        self._replay_index: dict[tuple[str, ...], int] = {}
+        self._next_index = 0
+
+        for _ in range(devices):
+            self._add_device()
+        self.connected = {
+            device_id
+            for device_id in self.devices
+            if self.random.random() < 0.5
+        }
+        self.connected.update(_node_id(index) for index in range(self.nodes))
+
+    def load_replay(self, path: str) -> None:
+        """Load captured responses to serve for the same actions."""
+        with open(path, encoding="utf-8") as capture:
+            for line in capture:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                key = tuple(action for action, _ in record["actions"])
+                self.replay.setdefault(key, []).append(record["responses"])
+
+    def _next_replay(self, actions: tuple[str, ...]) -> list[dict[str, Any]] | None:
+        """Return the next captured responses for the actions, cycling round."""
+        if not (captured := self.replay.get(actions)):
+            return None
+        index = self._replay_index.get(actions, 0)
+        self._replay_index[actions] = index + 1
+        return captured[index % len(captured)]
+
+    def _add_device(self) -> dict[str, Any]:
+        """Create a new client device."""
+        index = self._next_index
+        self._next_index += 1
+        device_id = _node_id(index)
+        node = index < self.nodes
+        device = {
+            "deviceID": device_id,
+            "lastChangeRevision": self.revision,
+            "model": {
+                "deviceType": "Mobile",
+                "manufacturer": "Emulated",
+                "modelNumber": f"E{index % 7}",
+            },
+            "unit": {"operatingSystem": "Emulated OS"},
+            "isAuthority": index == 0,
+            **({"nodeType": "Master" if index == 0 else "Slave"} if node else {}),
+            "friendlyName": f"device-{index}",
+            "knownInterfaces": [
+                {
+                    "macAddress": _mac(index),
+                    "interfaceType": "Wireless",
+                    "band": "5GHz" if index % 2 else "2.4GHz",
+                }
+            ],
+            "connections": [
+                {
+                    "macAddress": _mac(index),
+                    "ipAddress": f"10.{(index >> 16) & 0xFF}.{(index >> 8) & 0xFF}.{index & 0xFF}",
+                    "parentDeviceID": _node_id(0 if node else index % self.nodes),
+                }
+            ],
+            "properties": [],
+            "maxAllowedProperties": 16,
+        }
+        self.devices[device_id] = device
+        return device
+
+    def _bump(self, device: dict[str, Any]) -> None:
+        """Record a change to a device."""
+        self.revision += 1
+        device["lastChangeRevision"] = self.revision
+
+    def apply_churn(self) -> None:
+        """Randomly connect, disconnect, rename, add and remove devices."""
+        if not self.churn or not self.devices:
+            return
+        count = max(1, int(len(self.devices) * self.churn))
+        ids = list(self.devices)
+        for device_id in self.random.sample(ids, min(count, len(ids))):
+            action = self.random.random()
+            device = self.devices[device_id]
+            if action < 0.8:
+                # Routers list the connections of each device, so connecting
+                # or disconnecting changes it
+                self.connected ^= {device_id}
+                self._bump(device)
+            elif action < 0.9:
+                device["properties"] = [
+                    {"name": "userDeviceName", "value": f"renamed-{self.revision}"}
+                ]
+                self._bump(device)
+            elif action < 0.95:
+                self._bump(self._add_device())
+            elif "nodeType" not in device and not device["isAuthority"]:
+                del self.devices[device_id]
+                self.connected.discard(device_id)
+                self.revision += 1
+                self.deleted[device_id] = self.revision
+
+    def reboot(self) -> None:
+        """Simulate a router reboot, resetting the device revision."""
+        self.revision = 1
+        self.deleted = {}
+        for device in self.devices.values():
+            device["lastChangeRevision"] = 1
+
+    def _get_devices(self, request: dict[str, Any]) -> dict[str, Any]:
+        """Handle devicelist/GetDevices, in any version."""
+        since = request.get("sinceRevision", 0)
+        output: dict[str, Any] = {
+            "revision": self.revision,
+            "devices": [
+                device
+                for device in self.devices.values()
+                if device["lastChangeRevision"] > since
+            ],
+        }
+        if since:
+            output["deletedDeviceIDs"] = [
+                device_id
+                for device_id, revision in self.deleted.items()
+                if revision > since
+            ]
+        return output
+
+    def _get_connections(self) -> dict[str, Any]:
+        """Handle networkconnections/GetNetworkConnections, in any version."""
+        connections = []
+        for device_id in self.connected:
+            if (device := self.devices.get(device_id)) is None:
+                continue
+            interface = device["knownInterfaces"][0]
+            connections.append(
+                {
+                    "macAddress": interface["macAddress"],
+                    "negotiatedMbps": self.random.choice([72, 144, 433, 866]),
+                    "wireless": {
+                        "bssid": _mac(0),
+                        "isGuest": False,
+                        "band": interface["band"],
+                        "signalDecibels": self.random.randint(-90, -30),
+                    },
+                }
+            )
+        return {"connections": connections}
+
+    def handle_action(
+        self, action: str, request: dict[str, Any]
+    ) -> dict[str, Any] | None:
+        """Return the response for a single action, or None if unknown."""
+        if action == "core/CheckAdminPassword":
+            return {"result": "OK"}
+        if action == "core/GetDeviceInfo":
+            return {
+                "result": "OK",
+                "output": {
+                    "manufacturer": "Linksys",
+                    "modelNumber": "EMU1000",
+                    "hardwareVersion": "1",
+                    "description": "Emulated JNAP Router",
+                    "serialNumber": "EMU0000000001",
+                    "firmwareVersion": "1.0.0.000000",
+                    "firmwareDate": "2023-01-01T00:00:00Z",
+                    "services": SERVICES,
+                },
+            }
+        if action in (
+            "devicelist/GetDevices3",
+            "devicelist/GetDevices2",
+            "devicelist/GetDevices",
+        ):
+            return {"result": "OK", "output": self._get_devices(request)}
+        if action in (
+            "networkconnections/GetNetworkConnections2",
+            "networkconnections/GetNetworkConnections",
+        ):
+            return {"result": "OK", "output": self._get_connections()}
+        if action == "nodes/diagnostics/GetBackhaulInfo":
+            return {
+                "result": "OK",
+                "output": {
+                    "backhaulDevices": [
+                        {
+                            "deviceUUID": _node_id(index),
+                            "ipAddress": self.devices[_node_id(index)]["connections"][0][
+                                "ipAddress"
+                            ],
+                            "parentIPAddress": "10.0.0.0",
+                            "connectionType": "Wireless",
+                            "speedMbps": "866.7",
+                            "wirelessConnectionInfo": {
+                                "rssi": self.random.randint(-80, -40)
+                            },
+                        }
+                        for index in range(1, self.nodes)
+                        if _node_id(index) in self.devices
+                    ]
+                },
+            }
+        if action in ("router/GetWANStatus3", "router/GetWANStatus2", "router/GetWANStatus"):
+            return {
+                "result": "OK",
+                "output": {
+                    "wanStatus": "Connected",
+                    "wanConnection": {"ipAddress": "203.0.113.1"},
+                },
+            }
+        return None
+
+    async def handle(self, request: web.Request) -> web.Response:
+        """Handle a JNAP HTTP request."""
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if self.failure_rate and self.random.random() < self.failure_rate:
+            raise web.HTTPInternalServerError()
+
+        body = await request.json()
+        transaction = request.headers.get("X-JNAP-Action") == JNAP_TRANSACTION
+        if transaction:
+            actions = body
+        else:
+            actions = [
+                {
+                    "action": request.headers.get("X-JNAP-Action", ""),
+                    "request": body,
+                }
+            ]
+
+        authorized = request.headers.get("X-JNAP-Authorization") == self.auth
+        names = tuple(item["action"].removeprefix(JNAP_ACTION_URL) for item in actions)
+        if authorized and (replayed := self._next_replay(names)) is not None:
+            return web.json_response(
+                {"result": "OK", "responses": replayed} if transaction else replayed[0]
+            )
+        self.apply_churn()
+
+        responses = []
+        result = "OK"
+        for item in actions:
+            action = item["action"].removeprefix(JNAP_ACTION_URL)
+            if not authorized and action not in UNAUTHENTICATED_ACTIONS:
+                result = "_ErrorUnauthorized"
+                responses.append({"result": "_ErrorUnauthorized"})
+                break
+            response = self.handle_action(action, item.get("request") or {})
+            if response is None:
+                result = "_ErrorUnknownAction"
+                responses.append({"result": "_ErrorUnknownAction"})
+                break
+            responses.append(response)
+
+        if not transaction:
+            # Single actions are answered with the action's response alone
+            return web.json_response(responses[0])
+        return web.json_response({"result": result, "responses": responses})
+
+    def make_app(self) -> web.Application:
+        """Create the aiohttp application."""
+        app = web.Application(client_max_size=16 * 1024 * 1024)
+        app.router.add_post("/JNAP/", self.handle)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> web.AppRunner:
+        """Start serving, returning the runner. Port 0 picks a free port."""
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        return runner
+
+
+def main() -> None:
+    """Run the emulator from the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument(
+        "--churn", type=float, default=0.0,
+        help="fraction of devices changed per request",
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="seconds added to each request"
+    )
+    parser.add_argument(
+        "--failure-rate", type=float, default=0.0,
+        help="fraction of requests answered with HTTP 500",
+    )
+    parser.add_argument("--username", default="admin")
+    parser.add_argument("--password", default="admin")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument(
+        "--nodes", type=int, default=1, help="mesh nodes, including the router"
+    )
+    parser.add_argument(
+        "--replay", help="serve responses captured by jnap_cli.py for the same actions"
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    emulator = JNAPEmulator(
+        devices=args.devices,
+        churn=args.churn,
+        latency=args.latency,
+        failure_rate=args.failure_rate,
+        username=args.username,
+        password=args.password,
+        seed=args.seed,
+        nodes=args.nodes,
+    )
+    if args.replay:
+        emulator.load_replay(args.replay)
+    _LOGGER.info(
+        "Serving %s devices on http://%s:%s/JNAP/", args.devices, args.host, args.port
+    )
+    web.run_app(emulator.make_app(), host=args.host, port=args.port, print=None)
+
+
+if __name__ == "__main__":
+    main()